@@ -7,9 +7,36 @@ from tkinter.ttk import Notebook, Frame, Treeview, PanedWindow
 import numpy as np
 from math import ceil, floor
 
-from random import shuffle, randint
-from time import sleep
-from threading import Thread
+import queue
+from collections import namedtuple
+from time import monotonic
+from threading import Thread, current_thread
+
+from sudoku import BacktrackSolver, Step, Interrupted, generate, is_consistent, CELLS, EMPTY
+from sudoku.cache import SolutionCache
+from sudoku.generator import solution_grids
+from sudoku.play import PlayBoard
+
+# Solves and populates run on a worker thread that never touches Tk. It queues a
+# DrawEvent for every change to the board, and the main loop draws them every
+# FRAME_MS. run is the worker thread that queued the event, kind is "note" (value
+# shown on the tile at index in colour), "highlight" (the row, column or box named
+# by value around index, None to clear), "givens" (value is the puzzle just
+# populated) or "done". Paced events are the ones the speed control counts
+DrawEvent = namedtuple("DrawEvent", "run kind index value colour paced")
+
+FRAME_MS = 16
+# the seconds of each frame spent taking events off the queue
+DRAIN_BUDGET = 0.010
+# how many events the worker may get ahead of the drawing before it waits
+EVENT_BACKLOG = 4096
+
+SKIP = "Skip to result"
+# paced events drawn per second. "Step" only moves on when the Step button is
+# pressed, None draws as fast as the frames allow
+SPEEDS = {"Step": 0, "Slow": 4, "Normal": 20, "Fast": 100, "Fastest": None, SKIP: None}
+# the seconds the status line may spend searching the board for solutions
+STATUS_SEARCH_TIME = 0.1
 
 
 class Sudoku:
@@ -20,11 +47,18 @@ class Sudoku:
             self.label = label
 
             self.rect_id = -1
+            # what the tile was last drawn with, so redrawing it unchanged costs no Tk calls
+            self.fill = None
+            self.shown = None
 
             self.notes = [0, 0, 0, 0, 0, 0, 0, 0, 0]
             self.display_notes(0)
 
         def draw(self, anchor_x, anchor_y, square_x, square_y, square_size, square_fill):
+            if square_fill == self.fill:
+                return
+            self.fill = square_fill
+
             self.label.config(bg=square_fill)
             if self.rect_id == -1:
                 self.rect_id = self.canvas.create_rectangle(anchor_x + square_x * square_size,
@@ -38,7 +72,7 @@ class Sudoku:
 
         def display_notes(self, square_size, note_colour = "black"):
             # Reset a couple of things
-            self.label.config(font=("TkDefaultFont",), fg = note_colour)
+            font = ("TkDefaultFont",)
             self.value = -1
 
             count = 0
@@ -48,17 +82,17 @@ class Sudoku:
 
             if count == 0:
                 # This is hard-coded. A space for each number, plus a 3-space gap
-                self.label.config(text="         \n         \n         ")
+                output = "         \n         \n         "
 
             elif count == 1:
-                self.label.config(font=("TkDefaultFont", ceil(square_size / 2)), fg = note_colour)
+                font = ("TkDefaultFont", ceil(square_size / 2))
                 number = -1
                 for i in range(0, 9):
                     if self.notes[i]:
                         number = i + 1
 
                 self.value = number
-                self.label.config(text=str(number))
+                output = str(number)
 
             else:
                 output = ""
@@ -74,7 +108,12 @@ class Sudoku:
 
                     if i != 2:
                         output = output + "\n"
-                self.label.config(text=output)
+
+            # one config call for the whole change, none if the tile already shows it
+            shown = (output, font, note_colour)
+            if shown != self.shown:
+                self.shown = shown
+                self.label.config(text=output, font=font, fg=note_colour)
 
     def __init__(self, root):
         self.root = root
@@ -102,152 +141,219 @@ class Sudoku:
         self.root.bind("<Down>", lambda event: self.arrow_pressed(event))
 
         self.canvas.pack()
-        # the delay it takes for the ai to decide when to display
-        # the next value during generation, and solving
-        self.build_delay = 0.05
-        self.solve_delay = 0.05
-        self.highlight_delay = 0.06
+        # what the constraint model says about the board: conflicts, or whether it can still be solved
+        self.status_label = Label(root, text="")
+        self.status_label.pack()
+        # how fast solves and populates are drawn, one of SPEEDS
+        self.speed = StringVar(root, value="Normal")
         self.use_notes = True
-        self.sleep_interval = self.solve_delay
+        # solutions of boards solved before, reused for the instant (undrawn) solve
+        self.solution_cache = SolutionCache(256, solver="backtrack")
+        # full grids for populate, a few drawn from each random fill by shuffling it
+        self.solutions = solution_grids(reuse=8)
+        # the thread running the current solve or populate, replaced when a new one starts
+        self.worker = None
+        # DrawEvents from the worker, and what of them is yet to be drawn: the last
+        # value and colour of each tile changed and the last highlight, if any
+        self.events = queue.Queue(EVENT_BACKLOG)
+        self.pending_notes = {}
+        self.pending_highlight = None
+        self.pending_givens = None
+        # the next event of the current run, taken off the queue before it could be drawn
+        self.held = None
+        # how many paced events may still be drawn, topped up each frame at the chosen speed
+        self.credit = 0.0
+        self.last_frame = monotonic()
         self.create_game_board()
+        self.root.after(FRAME_MS, self.render_frame)
 
-    def get_row(self, rIndex: int, cIndex: int) -> set:
-        """ Returns the row at index rIndex of the board, ignoring the value at rIndex, cIndex as a set """
-        return {value.value if i != cIndex else -1 for i, value in enumerate(self.game_board[rIndex])}
-
-    def get_col(self, rIndex: int, cIndex: int) -> set:
-        """ Returns the column at index cIndex of the board, ignoring the value at rIndex, cIndex as a set """
-        return {row[cIndex].value if i != rIndex else -1 for i, row in enumerate(self.game_board)}
-
-    def get_box(self, rIndex: int, cIndex: int) -> set:
-        """ Returns the box at tile index rIndex, cIndex of the board as a set"""
-        box_r = rIndex // 3 * 3
-        box_c = cIndex // 3 * 3
-        box = set()
-        for subrow in range(box_r, box_r + 3):
-            for i, digit in enumerate(self.game_board[subrow][box_c:box_c + 3]):
-                if subrow != rIndex and i != cIndex:
-                    box.add(digit.value)
-
-        return box
-
-    def get_next_empty_tile(self, cur_rindex: int) -> tuple:
-        """ Retrieves the next empty tile in the board denoted by -1
-            :returns a tuple if the coord if found, -1, -1 if not """
-        for r in range(cur_rindex, 9):
-            for c in range(9):
-                if self.game_board[r][c].value == -1:
-                    return r, c
-
-        return -1, -1
-
-    def backtrack_solve(self, startR: int, random_select: bool = False, populate = False) -> bool:
-        """ Using a backtracking agent, solves a sudoku board
-            :param startR The row the backtracking algorithm starts working at
-            :param random_select if true then values of each tile are chosen randomly to test
-        """
-        # getting the next tile to work on if there exists one
-        emptyR, emptyC = self.get_next_empty_tile(startR)
+    def read_grid(self) -> list:
+        """ Returns the board as a flat grid for the solver engine. Tiles showing
+            several notes (or none) count as empty """
+        return [self.game_board[r][c].value if self.game_board[r][c].value != -1 else EMPTY
+                for r in range(9) for c in range(9)]
 
-        if emptyR == -1:
-            return True
+    def show_solve_step(self, step: Step):
+        """ Queues the drawing of a step of a visual solve. Subscribed to the solver engine """
+        if step.kind in ("row", "column", "box"):
+            if not self.use_notes:
+                return
 
-        # obtaining the possible values that can be used on the empty tile
-        # for it to still be considered a valid board
-        domain = {1, 2, 3, 4, 5, 6, 7, 8, 9}
-        if self.use_notes:
-
-            if populate:
-                self.reset_highlights()
-                self.highlight_row(emptyR)
-                self.highlight_square(emptyR, emptyC, color="#8de6e6", override=True)
-            domain -= self.get_row(emptyR, emptyC)
-            if populate:
-                self.update_note(emptyR, emptyC, domain, note_colour = "black")
-            if populate:
-                sleep(self.highlight_delay)
-
-            if populate:
-                self.reset_highlights()
-                self.highlight_column(emptyC)
-                self.highlight_square(emptyR, emptyC, color="#8de6e6", override=True)
-            domain -= self.get_col(emptyR, emptyC)
-            if populate:
-                self.update_note(emptyR, emptyC, domain, note_colour = "black")
-            if populate:
-                sleep(self.highlight_delay)
-
-            if populate:
-                self.reset_highlights()
-                self.highlight_sub_grid(emptyR // 3, emptyC // 3)
-                self.highlight_square(emptyR, emptyC, color="#8de6e6", override=True)
-            domain -= self.get_box(emptyR, emptyC)
-            if populate:
-                self.update_note(emptyR, emptyC, domain, note_colour = "black")
-            if populate:
-                sleep(self.highlight_delay)
+            self.post("highlight", step.index, step.kind)
+            self.post("note", step.index, step.value, paced=True)
+            if step.kind == "box":
+                self.post("highlight", step.index, None)
 
-            self.reset_highlights()
+        elif step.kind == "guess":
+            self.post("note", step.index, step.value, "red", paced=True)
 
-        else:
-            domain -= self.get_row(emptyR, emptyC)
-            domain -= self.get_col(emptyR, emptyC)
-            domain -= self.get_box(emptyR, emptyC)
-
-        # if there are no possible values, then we should backtrack
-        if len(domain) == 0:
-            return False
+        elif step.kind == "clear":
+            self.post("note", step.index, -1)
 
-        # shuffling the order of values we guess
-        # used during generation
-        if random_select:
-            domain = list(domain)
-            shuffle(domain)
+    def show_populate_step(self, step: Step):
+        """ Queues the drawing of a step of puzzle generation. Subscribed to the solver engine """
+        if step.kind in ("guess", "infer"):
+            self.post("note", step.index, step.value)
 
-        for value in domain:
-            if populate:
-                self.update_note(emptyR, emptyC, value, note_colour = "red")
-            else:
-                self.update_note(emptyR, emptyC, value, note_colour = "black")
+        elif step.kind == "clear":
+            self.post("note", step.index, -1)
 
-            if populate:
-                sleep(self.sleep_interval)
-
-            # the current sequence of values gives us a valid board
-            # then do not modify the state of the board, and return
-            if self.backtrack_solve(emptyR, random_select, populate):
-                return True
-
-        # if we tried all possible values for the tile but could not find
-        # a valid board, reset tile to empty then backtrack
-        self.update_note(emptyR, emptyC, -1, note_colour = "black")
-
-        return False
-
-    def threaded_backtrack_solve(self, delay = True):
-        """ A threaded version of the backtrack_solve """
-        th = Thread(target=self.backtrack_solve, args=[0, False, delay])
-        th.daemon = True
-        th.start()
+        elif step.kind == "remove":
+            # make that tile empty
+            self.post("note", step.index, -1, paced=True)
 
-    def remove_n_pieces_from_board(self, n: int):
-        """ Used to remove n pieces from the board during puzzle generation process """
-        while n:
+    def backtrack_solve(self, populate = False, grid = None) -> bool:
+        """ Solves the board using the solver engine
+            :param populate if true then every step of the search is drawn, at the chosen speed
+            :param grid the board to solve, read off the tiles when None
+        """
+        if grid is None:
+            grid = self.read_grid()
+        # the solver itself doesn't look at the givens, it would fill around a clash
+        if not is_consistent(grid):
+            return False
 
-            # choosing a random tile to make empty
-            r = randint(0, 8)
-            c = randint(0, 8)
+        if not populate:
+            solution = self.solution_cache.solve(grid)
+            if solution is None:
+                return False
 
-            # if the tile is already empty,
-            # find a tile that is not
-            while self.game_board[r][c].value == -1:
-                r = randint(0, 8)
-                c = randint(0, 8)
+            for i, value in enumerate(solution):
+                self.post("note", i, value)
+            return True
 
-            # make that tile empty
-            self.update_note(r, c, -1)
-            n -= 1
-            sleep(self.sleep_interval)
+        solver = BacktrackSolver(grid)
+        solver.subscribe(self.show_solve_step)
+
+        return solver.solve()
+
+    def check_superseded(self):
+        """ Stops a search whose thread is no longer the current worker, by raising Interrupted out of it """
+        if current_thread() is not self.worker:
+            raise Interrupted()
+
+    def post(self, kind: str, index: int = 0, value = -1, colour = "black", paced = False):
+        """ Queues a DrawEvent for render_frame. Called on the worker thread, which waits
+            here while the drawing is EVENT_BACKLOG events behind """
+        if value == EMPTY:
+            value = -1
+        event = DrawEvent(current_thread(), kind, index, value, colour, paced)
+        while True:
+            self.check_superseded()
+            try:
+                self.events.put(event, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def render_frame(self):
+        """ Draws the events queued since the last frame, as many as the speed allows.
+            Events from a superseded run are dropped, and a tile changed several times
+            in one frame is only redrawn once. Reschedules itself every FRAME_MS """
+        speed = self.speed.get()
+        rate = SPEEDS[speed]
+        now = monotonic()
+        if rate is not None:
+            # a frame never banks more than its own share, so a stalled queue doesn't lead to a burst
+            self.credit = min(self.credit + rate * (now - self.last_frame), max(1.0, rate * FRAME_MS / 1000))
+        self.last_frame = now
+
+        done = False
+        deadline = now + DRAIN_BUDGET
+        while True:
+            event, self.held = self.held, None
+            if event is None:
+                try:
+                    event = self.events.get_nowait()
+                except queue.Empty:
+                    break
+            if event.run is not self.worker:
+                continue
+            if rate is not None and self.credit < 1:
+                # kept for a later frame, after dropping any stale events in front of it
+                self.held = event
+                break
+
+            if event.kind == "note":
+                self.pending_notes[event.index] = (event.value, event.colour)
+            elif event.kind == "highlight":
+                self.pending_highlight = (event.value, event.index)
+            elif event.kind == "givens":
+                self.pending_givens = event.value
+            else:
+                done = True
+            if event.paced and rate is not None:
+                self.credit -= 1
+
+            if monotonic() > deadline:
+                break
+
+        if speed != SKIP or done:
+            self.flush()
+        if done:
+            self.show_status()
+        self.root.after(FRAME_MS, self.render_frame)
+
+    def flush(self):
+        """ Draws the pending notes and highlight """
+        if self.pending_highlight is not None:
+            self.show_highlight(*self.pending_highlight)
+            self.pending_highlight = None
+
+        for index, (value, colour) in self.pending_notes.items():
+            self.update_note(index // 9, index % 9, value, note_colour = colour)
+        self.pending_notes.clear()
+
+        if self.pending_givens is not None:
+            self.reset_model(self.pending_givens)
+            self.pending_givens = None
+
+    def step(self):
+        """ Draws the next step when the speed is "Step" """
+        self.credit += 1
+
+    def run_in_background(self, target, *args):
+        """ Runs target on a new worker thread. A solve or populate still running is
+            interrupted at its next step, and the new one starts once it has stopped """
+        previous = self.worker
+
+        def run():
+            if previous is not None:
+                previous.join()
+            try:
+                target(*args)
+                self.post("done")
+            except Interrupted:
+                pass
+
+        # replaced first, so the previous run stops queueing events before the ones
+        # it left undrawn are dropped
+        self.worker = Thread(target=run)
+        self.worker.daemon = True
+        while not self.events.empty():
+            self.events.get_nowait()
+        self.pending_notes.clear()
+        self.pending_highlight = None
+        self.pending_givens = None
+        self.held = None
+        self.credit = 0.0
+        # the run may rewrite any tile, so nothing is a given while it does
+        self.reset_model()
+
+        self.worker.start()
+
+    def threaded_backtrack_solve(self, delay = None):
+        """ A threaded version of the backtrack_solve. Unless delay says otherwise the
+            search is drawn, except at "Skip to result", which has nothing of it to
+            show and solves through the solution cache instead """
+        if delay is None:
+            delay = self.speed.get() != SKIP
+        grid = self.read_grid()
+        if not is_consistent(grid):
+            # nothing to solve, the clash stays on the board and in the status
+            self.show_status()
+            return
+        self.run_in_background(self.backtrack_solve, delay, grid)
 
     def update_note(self, rIndex: int, cIndex: int, values: iter, note_colour = "red"):
         """ Used to update which number(s) are being displayed on a tile """
@@ -261,27 +367,44 @@ class Sudoku:
                     notes[v - 1] = 1
         self.game_board[rIndex][cIndex].notes = notes
         self.game_board[rIndex][cIndex].display_notes(self.square_size, note_colour)
+        value = self.game_board[rIndex][cIndex].value if self.game_board[rIndex][cIndex].value != -1 else EMPTY
+        if rIndex * 9 + cIndex in self.model.givens and value != self.model.grid[rIndex * 9 + cIndex]:
+            # the populated puzzle is being overwritten, so its tiles are no longer fixed
+            self.reset_model()
+        else:
+            self.model.write(rIndex * 9 + cIndex, value)
+
+    def reset_model(self, givens = None):
+        """ Rebuilds the constraint model from the tiles, the filled cells of givens
+            (a grid) becoming fixed. The tiles must agree with givens """
+        self.model = PlayBoard(givens if givens is not None else [EMPTY] * CELLS, search_time=STATUS_SEARCH_TIME)
+        for index, value in enumerate(self.read_grid()):
+            if value != EMPTY and index not in self.model.givens:
+                self.model.write(index, value)
+
+    def show_status(self):
+        """ Shows what the model says about the board. Only this asks for its status,
+            which can take a search when the board has no givens """
+        if self.model.conflicted:
+            text = "Some numbers clash"
+        else:
+            text = {"solved": "Solved!", "unique": "One solution left", "multiple": "Several solutions left",
+                    "unsolvable": "No solution left", "unknown": "Too early to tell"}[self.model.status()]
+        self.status_label.config(text=text)
 
     def populate_board(self, n = 30):
-        """ Used to fill the board with a solvable sudoku game """
+        """ Used to fill the board with a solvable sudoku game, with n pieces removed """
 
-        # setting the sleep interval to the build delay
-        # temp until a slider is added
-        #self.sleep_interval = self.build_delay
-
-        # calling our solver to fill in the board, choosing which value
-        # to do randomly
-        self.backtrack_solve(0, True)
-        self.remove_n_pieces_from_board(n)
-
-        # resetting the delay to the default, the solve_delay
-        #self.sleep_interval = self.solve_delay
+        # the engine empties n tiles of a full grid, which it filled choosing
+        # values randomly or shuffled from a previous one. Each of those steps is
+        # drawn at the chosen speed
+        puzzle = generate(CELLS - n, listener=self.show_populate_step, solution=next(self.solutions))
+        # its filled tiles can't be changed by hand
+        self.post("givens", value=puzzle)
 
     def threaded_populate_board(self, n = 30):
         """ a threaded version of the populate_board function """
-        th = Thread(target=self.populate_board, args = [n])
-        th.daemon = True
-        th.start()
+        self.run_in_background(self.populate_board, n)
 
     # Mathematically determine which square was clicked, then highlight the cross-section
     def right_click(self, event, root_widget=None):
@@ -300,12 +423,22 @@ class Sudoku:
     def number_pressed(self, event):
         if self.current_cross_section != None:
             x, y = self.current_cross_section
+            if x * 9 + y in self.model.givens:
+                return
+
             key = int(event.char)
             self.game_board[x][y].notes[key - 1] = not self.game_board[x][y].notes[key - 1]
             self.game_board[x][y].display_notes(self.square_size)
+            value = self.game_board[x][y].value
+            self.model.write(x * 9 + y, value if value != -1 else EMPTY)
+            conflicts = self.model.conflicts(x * 9 + y)
 
-            if self.game_board[x][y].value != -1:
-                self.highlight_cross_sections_of_same_number(x, y)
+            self.reset_highlights()
+            self.highlight_cross_section(x, y)
+            # the tiles the new number clashes with, and the tile itself
+            for index in conflicts + ((x * 9 + y,) if conflicts else ()):
+                self.highlight_square(index // 9, index % 9, color="#ffb3b3", override=True)
+            self.show_status()
 
     def arrow_pressed(self, event):
         if self.current_cross_section == None:
@@ -358,6 +491,7 @@ class Sudoku:
         self.draw_outer_lines()
 
         self.highlights = np.zeros((9, 9))
+        self.reset_model()
 
     def create_tile(self, row, column):
         temp = Label(self.canvas, text="0   0   0\n0   0   0\n0   0   0", bg="white")
@@ -404,6 +538,28 @@ class Sudoku:
             # We don't want to toggle off already highlighted squares here on accident
             self.highlight_square(i, column, override=True)
 
+    def show_highlight(self, kind, index):
+        """ Highlights the row, column or box (kind) of the tile at index, with the tile
+            itself darker, clearing every other highlight. Only tiles whose colour
+            changes are redrawn. kind None clears all highlights """
+        row, column = divmod(index, 9)
+        colours = {}
+        if kind == "row":
+            colours = {(row, j): "#cfffff" for j in range(0, 9)}
+        elif kind == "column":
+            colours = {(i, column): "#cfffff" for i in range(0, 9)}
+        elif kind == "box":
+            colours = {(i, j): "#cfffff" for i in range(row - row % 3, row - row % 3 + 3)
+                       for j in range(column - column % 3, column - column % 3 + 3)}
+        if kind is not None:
+            colours[(row, column)] = "#8de6e6"
+
+        for i in range(0, 9):
+            for j in range(0, 9):
+                colour = colours.get((i, j))
+                self.highlights[i][j] = colour is not None
+                self.game_board[i][j].draw(self.anchor_x, self.anchor_y, i, j, self.square_size, colour or "white")
+
     def highlight_cross_section(self, row, column):
         self.highlight_row(row)
         self.highlight_column(column)
@@ -418,12 +574,13 @@ class Sudoku:
 
         # Not -1 implies no notes are on the tile
         if number != -1:
-            for i in range(0, 9):
-                for j in range(0, 9):
-                    if self.game_board[i][j].value == number and i != row and j != column:
-                        # Don't use highlight cross section here. This should be purely visual
-                        self.highlight_row(i)
-                        self.highlight_column(j)
+            # the model knows where each number is, no need to look through every tile
+            for index in self.model.cells_with(number):
+                i, j = divmod(index, 9)
+                if i != row and j != column:
+                    # Don't use highlight cross section here. This should be purely visual
+                    self.highlight_row(i)
+                    self.highlight_column(j)
 
     def highlight_sub_grid(self, row, column):
         # There's a good chance we accidentally use this function for a square rather than a subgrid
@@ -457,12 +614,15 @@ Entering values on the board:
 This can be done by clicking on the square you wish to enter a number into, then click that number on your keyboard. Arrow keys can be used to move around on the grid. 
 To remove a number, simply go to that square and type the number a second time. 
 Multiple numbers can be entered into the same square to make 'notes'
+Numbers that clash with another in the same row, column or box are highlighted in red, and the line under the board tells whether the board can still be solved. The numbers of a populated board can't be changed
+
+Clicking 'Populate' or 'Solve' while the board is populating or solving stops that run and starts the new one
 
-Please do not click the 'Populate' or 'Solve' buttons while the board is populating or solving"""
+The speed menu sets how fast populating and solving are drawn. 'Step' draws one step each time 'Step' is clicked, 'Skip to result' only draws the finished board, and solves boards seen before (or any rotation, reflection or relabelling of them) at once"""
         messagebox.showinfo("How to Use", text)
     
     def choose_difficulty(self):
-        difficulty_window = Toplevel(root)
+        difficulty_window = Toplevel(self.root)
         easy_btn = Button(difficulty_window, text="Easy", command=lambda: [self.threaded_populate_board(30), difficulty_window.destroy()])
         easy_btn.pack()
         normal_btn = Button(difficulty_window, text="Normal", command=lambda:  [self.threaded_populate_board(45), difficulty_window.destroy()])
@@ -470,18 +630,25 @@ Please do not click the 'Populate' or 'Solve' buttons while the board is populat
         hard_btn = Button(difficulty_window, text="Hard", command=lambda: [self.threaded_populate_board(60), difficulty_window.destroy()])
         hard_btn.pack()
 
-root = tk.Tk()
-root.title("Sudoku")
+if __name__ == "__main__":
+    root = tk.Tk()
+    root.title("Sudoku")
+
+    sudoku = Sudoku(root)
+
+    help_btn = Button(root, text='How to Use', command=sudoku.how_to_use_text)
+    help_btn.pack()
 
-sudoku = Sudoku(root)
+    solve_btn = Button(root, text='Solve', command=sudoku.threaded_backtrack_solve)
+    solve_btn.pack()
 
-help_btn = Button(root, text='How to Use', command=sudoku.how_to_use_text)
-help_btn.pack()
+    populate_btn = Button(root, text='Populate', command=sudoku.choose_difficulty)
+    populate_btn.pack()
 
-solve_btn = Button(root, text='Solve', command=sudoku.threaded_backtrack_solve)
-solve_btn.pack()
+    speed_menu = OptionMenu(root, sudoku.speed, *SPEEDS)
+    speed_menu.pack()
 
-populate_btn = Button(root, text='Populate', command=sudoku.choose_difficulty)
-populate_btn.pack()
+    step_btn = Button(root, text='Step', command=sudoku.step)
+    step_btn.pack()
 
-root.mainloop()
+    root.mainloop()
@@ -0,0 +1,36 @@
+""" Compares solve_batch against solving the same puzzles one at a time.
+
+    python -m benchmarks.bench_batch [corpus ...]
+"""
+import sys
+from time import perf_counter
+
+import numpy as np
+
+from sudoku import solve
+from sudoku.batch import solve_batch
+
+from .common import load_corpus
+
+REPEAT = 200
+
+
+def main(names):
+    print("%-10s %8s %14s %14s" % ("corpus", "puzzles", "batch/sec", "one by one/sec"))
+    for name in names:
+        puzzles = load_corpus(name) * REPEAT
+
+        start = perf_counter()
+        solve_batch(np.array(puzzles, dtype=np.int8))
+        batch = len(puzzles) / (perf_counter() - start)
+
+        start = perf_counter()
+        for grid in puzzles:
+            solve(grid)
+        single = len(puzzles) / (perf_counter() - start)
+
+        print("%-10s %8d %14.0f %14.0f" % (name, len(puzzles), batch, single))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or ["easy", "medium", "hard"])
@@ -0,0 +1,22 @@
+""" Compares the "sets" and "bitmask" candidate modes of BacktrackSolver.
+
+    python -m benchmarks.bench_candidates [corpus ...]
+"""
+import sys
+
+from sudoku import BacktrackSolver, CANDIDATE_MODES
+
+from .common import load_corpus, run_solver
+
+
+def main(names):
+    print("%-10s %-8s %10s %12s %12s" % ("corpus", "mode", "seconds", "nodes", "nodes/sec"))
+    for name in names:
+        puzzles = load_corpus(name)
+        for mode in CANDIDATE_MODES:
+            seconds, nodes = run_solver(lambda grid: BacktrackSolver(grid, candidates=mode, heuristic="first"), puzzles)
+            print("%-10s %-8s %10.3f %12d %12.0f" % (name, mode, seconds, nodes, nodes / seconds))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or ["easy", "medium", "hard"])
@@ -0,0 +1,34 @@
+""" Head to head comparison of the solving engines.
+
+    python -m benchmarks.bench_engines [corpus ...]
+"""
+import sys
+from statistics import median
+from time import perf_counter
+
+from sudoku import SOLVERS, make_solver
+
+from .common import load_corpus
+
+
+def main(names):
+    print("%-10s %-10s %10s %12s %12s %12s" % ("corpus", "solver", "seconds", "median ms", "worst ms", "nodes"))
+    for name in names:
+        puzzles = load_corpus(name)
+        for solver_name in SOLVERS:
+            times = []
+            nodes = 0
+            for grid in puzzles:
+                start = perf_counter()
+                solver = make_solver(grid, solver=solver_name)
+                if solver.count_solutions(2) != 1:
+                    raise RuntimeError("Corpus puzzle does not have a unique solution")
+                times.append(perf_counter() - start)
+                nodes += solver.nodes
+
+            print("%-10s %-10s %10.3f %12.3f %12.3f %12d" % (name, solver_name, sum(times), median(times) * 1000,
+                                                            max(times) * 1000, nodes))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or ["clue17", "hardest"])
@@ -0,0 +1,47 @@
+""" Measures how fast complete grids are made, filling every one against deriving
+    runs of them from one fill by symmetry, and what that does for generation.
+
+    python -m benchmarks.bench_fill [count] [reuse ...]
+"""
+import sys
+from itertools import islice
+from random import Random
+from time import perf_counter
+
+from sudoku import generate, is_solved
+from sudoku.generator import solution_grids
+
+REUSES = (1, 4, 16, 64, 256)
+# generation is far slower than filling, so it is timed on a fraction of count
+GENERATE_SHARE = 20
+
+
+def main(count: int, reuses):
+    print("%-6s %10s %12s %9s %14s %9s" % ("reuse", "seconds", "grids/sec", "speedup", "puzzles/sec", "speedup"))
+    base_grids = base_puzzles = None
+    for reuse in reuses:
+        start = perf_counter()
+        grids = list(islice(solution_grids(Random(0), reuse), count))
+        seconds = perf_counter() - start
+        if not all(is_solved(grid) for grid in grids):
+            raise RuntimeError("A derived grid is not a solution")
+
+        puzzles = max(1, count // GENERATE_SHARE)
+        rng = Random(0)
+        solutions = solution_grids(rng, reuse)
+        start = perf_counter()
+        for _ in range(puzzles):
+            generate(30, rng=rng, solution=next(solutions))
+        generate_seconds = perf_counter() - start
+
+        grid_rate = count / seconds
+        puzzle_rate = puzzles / generate_seconds
+        base_grids = base_grids or grid_rate
+        base_puzzles = base_puzzles or puzzle_rate
+        print("%-6d %10.3f %12.1f %8.1fx %14.1f %8.1fx" % (reuse, seconds, grid_rate, grid_rate / base_grids,
+                                                            puzzle_rate, puzzle_rate / base_puzzles))
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 2000, [int(a) for a in args[1:]] or REUSES)
@@ -0,0 +1,29 @@
+""" Measures puzzle generation throughput for each removal symmetry.
+
+    python -m benchmarks.bench_generate [clues] [count]
+"""
+import sys
+from random import Random
+from time import perf_counter
+
+from sudoku import SYMMETRIES, generate
+
+
+def main(clues: int, count: int):
+    print("%-11s %-7s %10s %12s %12s" % ("symmetry", "unique", "seconds", "puzzles/sec", "mean clues"))
+    for symmetry in SYMMETRIES:
+        for unique in (True, False):
+            rng = Random(0)
+            filled = 0
+            start = perf_counter()
+            for _ in range(count):
+                grid = generate(clues, rng=rng, unique=unique, symmetry=symmetry)
+                filled += sum(1 for v in grid if v)
+            seconds = perf_counter() - start
+
+            print("%-11s %-7s %10.3f %12.1f %12.1f" % (symmetry, unique, seconds, count / seconds, filled / count))
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 25, int(args[1]) if len(args) > 1 else 50)
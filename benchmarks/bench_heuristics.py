@@ -0,0 +1,22 @@
+""" Compares the cell selection heuristics of BacktrackSolver.
+
+    python -m benchmarks.bench_heuristics [corpus ...]
+"""
+import sys
+
+from sudoku import BacktrackSolver, HEURISTICS
+
+from .common import load_corpus, run_solver
+
+
+def main(names):
+    print("%-10s %-11s %10s %12s %14s" % ("corpus", "heuristic", "seconds", "nodes", "nodes/puzzle"))
+    for name in names:
+        puzzles = load_corpus(name)
+        for heuristic in HEURISTICS:
+            seconds, nodes = run_solver(lambda grid: BacktrackSolver(grid, heuristic=heuristic), puzzles)
+            print("%-10s %-11s %10.3f %12d %14.1f" % (name, heuristic, seconds, nodes, nodes / len(puzzles)))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or ["easy", "medium", "hard"])
@@ -0,0 +1,41 @@
+""" Measures how generation and solving throughput scale with the number of processes.
+
+    python -m benchmarks.bench_parallel [count]
+"""
+import os
+import sys
+from time import perf_counter
+
+from sudoku.parallel import solve_many, generate_many
+
+from .common import load_corpus
+
+
+def main(count: int):
+    puzzles = load_corpus("hard")
+    puzzles = (puzzles * (count // len(puzzles) + 1))[:count]
+
+    processes = 1
+    counts = []
+    while processes < (os.cpu_count() or 1):
+        counts.append(processes)
+        processes *= 2
+    counts.append(os.cpu_count() or 1)
+
+    print("%10s %14s %14s" % ("processes", "solved/sec", "generated/sec"))
+    for processes in counts:
+        start = perf_counter()
+        for _ in solve_many(puzzles, processes=processes):
+            pass
+        solved = count / (perf_counter() - start)
+
+        start = perf_counter()
+        for _ in generate_many(count // 10, clues=25, processes=processes):
+            pass
+        generated = count // 10 / (perf_counter() - start)
+
+        print("%10d %14.0f %14.1f" % (processes, solved, generated))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
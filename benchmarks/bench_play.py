@@ -0,0 +1,63 @@
+""" Measures move validation on PlayBoards against checking the whole board after
+    every move, the way a client without the incremental model would.
+
+    python -m benchmarks.bench_play [moves]
+"""
+import sys
+from random import Random
+from time import perf_counter
+
+from sudoku import EMPTY, count_solutions, is_consistent
+from sudoku.grid import PEERS
+from sudoku.play import PlayBoard
+
+from .common import load_corpus
+
+
+def random_moves(puzzles: list, count: int) -> list:
+    """ (puzzle number, cell, value) triples playing random digits into the puzzles' empty cells """
+    rng = Random(0)
+    moves = []
+    for _ in range(count):
+        number = rng.randrange(len(puzzles))
+        free = [i for i, v in enumerate(puzzles[number]) if v == EMPTY]
+        moves.append((number, rng.choice(free), rng.randrange(10)))
+
+    return moves
+
+
+def main(count: int):
+    puzzles = load_corpus("medium")
+    moves = random_moves(puzzles, count)
+
+    start = perf_counter()
+    boards = [PlayBoard(puzzle) for puzzle in puzzles]
+    opening = perf_counter() - start
+
+    start = perf_counter()
+    for number, cell, value in moves:
+        boards[number].place(cell, value)
+    incremental = perf_counter() - start
+
+    # the same answers from the board alone: clashes from the peers, candidates by
+    # scanning them, and the status from a fresh search
+    grids = [list(puzzle) for puzzle in puzzles]
+    rescans = max(1, count // 100)
+    start = perf_counter()
+    for number, cell, value in moves[:rescans]:
+        grid = grids[number]
+        grid[cell] = value
+        [i for i in PEERS[cell] if value != EMPTY and grid[i] == value]
+        [d for d in range(1, 10) if all(grid[i] != d for i in PEERS[cell])]
+        is_consistent(grid) and count_solutions(grid)
+    rescan = (perf_counter() - start) / rescans * count
+
+    print("%d puzzles opened in %.3f s" % (len(puzzles), opening))
+    print("%-12s %10s %12s" % ("validation", "seconds", "moves/sec"))
+    print("%-12s %10.3f %12.0f" % ("incremental", incremental, count / incremental))
+    print("%-12s %10.3f %12.0f   (estimated from %d moves)" % ("rescan", rescan, count / rescan, rescans))
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 100000)
@@ -0,0 +1,35 @@
+""" Compares plain backtracking against backtracking with constraint propagation.
+
+    python -m benchmarks.bench_propagation [corpus ...]
+"""
+import sys
+from statistics import median
+from time import perf_counter
+
+from sudoku import BacktrackSolver, PropagatingSolver
+
+from .common import load_corpus
+
+
+def main(names):
+    print("%-10s %-10s %14s %12s %12s" % ("corpus", "solver", "median ms", "nodes", "no guesses"))
+    for name in names:
+        puzzles = load_corpus(name)
+        for label, make_solver in (("backtrack", BacktrackSolver), ("propagate", PropagatingSolver)):
+            times = []
+            nodes = 0
+            guess_free = 0
+            for grid in puzzles:
+                start = perf_counter()
+                solver = make_solver(grid)
+                solver.solve()
+                times.append(perf_counter() - start)
+                nodes += solver.nodes
+                guess_free += getattr(solver, "guesses", None) == 0
+
+            print("%-10s %-10s %14.3f %12d %9d/%d" % (name, label, median(times) * 1000, nodes,
+                                                      guess_free, len(puzzles)))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or ["easy", "medium", "hard"])
@@ -0,0 +1,48 @@
+""" Measures generation and solving across board sizes, for load tests on bigger boards.
+    Each puzzle is generated with unique=True and then solved by every engine. An engine
+    that needs more than TIME_LIMIT seconds for a puzzle is stopped and reported as such:
+    plain backtracking does not scale to 25x25.
+
+    python -m benchmarks.bench_sizes [count] [box ...]
+"""
+import sys
+from random import Random
+from time import perf_counter
+
+from sudoku import SOLVERS, Interrupted, generate, solve, is_solved
+from sudoku.grid import geometry
+
+# the givens each generated puzzle is aimed at, as a fraction of the cells
+CLUE_FRACTION = 0.5
+TIME_LIMIT = 10.0
+
+
+def main(count: int, boxes):
+    print("%-7s %-10s %10s %12s" % ("board", "step", "seconds", "per puzzle"))
+    for box in boxes:
+        board = geometry(box)
+        name = "%dx%d" % (board.size, board.size)
+        rng = Random(0)
+
+        start = perf_counter()
+        puzzles = [generate(int(board.cells * CLUE_FRACTION), rng=rng, box=box) for _ in range(count)]
+        seconds = perf_counter() - start
+        print("%-7s %-10s %10.3f %12.3f" % (name, "generate", seconds, seconds / count))
+
+        for solver in sorted(SOLVERS):
+            start = perf_counter()
+            try:
+                for grid in puzzles:
+                    deadline = perf_counter() + TIME_LIMIT
+                    if not is_solved(solve(grid, solver=solver, interrupt=lambda: perf_counter() > deadline)):
+                        raise RuntimeError("%s failed on a generated puzzle" % solver)
+            except Interrupted:
+                print("%-7s %-10s %10s %12s" % (name, solver, "-", "> %gs" % TIME_LIMIT))
+                continue
+            seconds = perf_counter() - start
+            print("%-7s %-10s %10.3f %12.3f" % (name, solver, seconds, seconds / count))
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    main(int(args[0]) if args else 3, [int(a) for a in args[1:]] or [2, 3, 4, 5])
@@ -0,0 +1,27 @@
+import os
+from time import perf_counter
+
+from sudoku import parse
+
+CORPORA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpora")
+
+
+def load_corpus(name: str) -> list:
+    """ Loads benchmarks/corpora/<name>.txt, one 81 character puzzle per line """
+    with open(os.path.join(CORPORA_DIR, name + ".txt")) as f:
+        return [parse(line) for line in f if line.strip() and not line.startswith("#")]
+
+
+def run_solver(make_solver, puzzles) -> tuple:
+    """ Solves every puzzle with a fresh solver from make_solver(grid)
+        :returns (seconds, total nodes searched)
+    """
+    nodes = 0
+    start = perf_counter()
+    for grid in puzzles:
+        solver = make_solver(grid)
+        if not solver.solve():
+            raise RuntimeError("Solver failed on a corpus puzzle")
+        nodes += solver.nodes
+
+    return perf_counter() - start, nodes
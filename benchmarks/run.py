@@ -0,0 +1,206 @@
+""" Benchmark harness. Runs every solver configuration on the bundled corpora, plus
+    the generator, and writes the results as JSON so runs can be diffed and checked
+    for regressions.
+
+    python -m benchmarks.run [-o results.json] [--baseline old.json] [--tolerance 0.25]
+
+    Every puzzle is timed --rounds times and its best time kept, which irons out most
+    of the noise of a single run. Exits with status 1 when --baseline is given and any
+    configuration got slower or used more memory than the tolerance allows, or is
+    missing from the run. p99 latency is only checked for configurations with at least
+    MIN_P99_SAMPLES puzzles (use --repeat for that), below which it is close to the
+    single slowest puzzle.
+"""
+import argparse
+import json
+import platform
+import sys
+import tracemalloc
+from random import Random
+from time import perf_counter
+
+from sudoku import SOLVERS, SYMMETRIES, TECHNIQUES, ADVANCED_TECHNIQUES, make_solver, generate
+
+from .common import load_corpus
+
+CORPORA = ("easy", "medium", "hard", "clue17", "hardest")
+GENERATE_CLUES = 25
+GENERATE_COUNT = 20
+ROUNDS = 3
+MIN_P99_SAMPLES = 50
+
+# solver configurations by name: (solver, options, the corpora to run it on, None for
+# all). Each solver's defaults run under its own name
+CONFIGURATIONS = dict({name: (name, {}, None) for name in SOLVERS}, **{
+    "backtrack-sets": ("backtrack", {"candidates": "sets"}, None),
+    # tens of seconds on the hard corpora
+    "backtrack-first": ("backtrack", {"heuristic": "first"}, ("easy", "medium")),
+    "backtrack-mrv_degree": ("backtrack", {"heuristic": "mrv_degree"}, None),
+    "propagate-singles": ("propagate", {"techniques": ()}, None),
+    "propagate-advanced": ("propagate", {"techniques": TECHNIQUES + ADVANCED_TECHNIQUES}, None),
+    "propagate-mrv_degree": ("propagate", {"heuristic": "mrv_degree"}, None),
+})
+
+
+def percentile(values: list, fraction: float) -> float:
+    """ Nearest-rank percentile of values """
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def best_times(job, rounds: int) -> tuple:
+    """ Runs job() rounds times, keeping the fastest time of each item
+        :returns (times, nodes) like job
+    """
+    times, nodes = job()
+    for _ in range(rounds - 1):
+        times = [min(pair) for pair in zip(times, job()[0])]
+
+    return times, nodes
+
+
+def summarize(times: list, nodes) -> dict:
+    total = sum(times)
+    return {
+        "count": len(times),
+        "seconds": total,
+        "puzzles_per_sec": len(times) / total,
+        "nodes_per_sec": nodes / total if nodes is not None else None,
+        "p50_ms": percentile(times, 0.50) * 1000,
+        "p99_ms": percentile(times, 0.99) * 1000,
+    }
+
+
+def peak_memory(job) -> int:
+    """ The most memory in bytes that job() held at once, traced separately from the timed runs """
+    tracemalloc.start()
+    try:
+        job()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_solver(solver_name: str, options: dict, puzzles: list, rounds: int) -> dict:
+    def job():
+        times, nodes = [], 0
+        for grid in puzzles:
+            start = perf_counter()
+            solver = make_solver(grid, solver=solver_name, **options)
+            if not solver.solve():
+                raise RuntimeError("%s failed on a corpus puzzle" % solver_name)
+            times.append(perf_counter() - start)
+            nodes += solver.nodes
+        return times, nodes
+
+    result = summarize(*best_times(job, rounds))
+    result["peak_memory_bytes"] = peak_memory(job)
+    return result
+
+
+def bench_generate(symmetry: str, count: int, rounds: int) -> dict:
+    def job():
+        rng = Random(0)
+        times = []
+        for _ in range(count):
+            start = perf_counter()
+            generate(GENERATE_CLUES, rng=rng, symmetry=symmetry)
+            times.append(perf_counter() - start)
+        return times, None
+
+    result = summarize(*best_times(job, rounds))
+    result["peak_memory_bytes"] = peak_memory(job)
+    return result
+
+
+def run(repeat: int, rounds: int, corpora, log) -> dict:
+    results = {}
+    for name in corpora:
+        puzzles = load_corpus(name) * repeat
+        for config, (solver_name, options, only) in CONFIGURATIONS.items():
+            if only is not None and name not in only:
+                continue
+            key = "solve/%s/%s" % (config, name)
+            results[key] = bench_solver(solver_name, options, puzzles, rounds)
+            log(key, results[key])
+
+    for symmetry in SYMMETRIES:
+        key = "generate/%s/%d" % (symmetry, GENERATE_CLUES)
+        results[key] = bench_generate(symmetry, GENERATE_COUNT * repeat, rounds)
+        log(key, results[key])
+
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "corpora": list(corpora),
+        "rounds": rounds,
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list:
+    """ Returns a description of every metric in current that regressed past tolerance against
+        baseline, and of every configuration of baseline that current should have run but did not
+    """
+    problems = []
+    for key, old in baseline["results"].items():
+        new = current["results"].get(key)
+        if new is None:
+            # solve/<configuration>/<corpus> results of corpora left out of this run aren't missed
+            parts = key.split("/")
+            if parts[0] != "solve" or parts[2] in current.get("corpora", CORPORA):
+                problems.append("%s: missing from this run" % key)
+            continue
+        if new["puzzles_per_sec"] < old["puzzles_per_sec"] * (1 - tolerance):
+            problems.append("%s: %.1f puzzles/sec, was %.1f" % (key, new["puzzles_per_sec"], old["puzzles_per_sec"]))
+        if min(new["count"], old["count"]) >= MIN_P99_SAMPLES and new["p99_ms"] > old["p99_ms"] * (1 + tolerance):
+            problems.append("%s: p99 %.3f ms, was %.3f" % (key, new["p99_ms"], old["p99_ms"]))
+        if new["peak_memory_bytes"] > old["peak_memory_bytes"] * (1 + tolerance):
+            problems.append("%s: peak memory %d bytes, was %d" % (key, new["peak_memory_bytes"],
+                                                                  old["peak_memory_bytes"]))
+
+    return problems
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-o", "--output", help="write the JSON results here instead of stdout")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to check against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed fractional slowdown or memory growth (default 0.25)")
+    parser.add_argument("--repeat", type=int, default=1, help="run each corpus this many times")
+    parser.add_argument("--rounds", type=int, default=ROUNDS,
+                        help="time every puzzle this many times, keeping the best (default %d)" % ROUNDS)
+    parser.add_argument("--corpus", action="append", choices=CORPORA, help="only run these corpora")
+    args = parser.parse_args(argv)
+
+    def log(key, result):
+        print("%-36s %10.1f/s %10.3f ms p50 %10.3f ms p99" % (key, result["puzzles_per_sec"], result["p50_ms"],
+                                                              result["p99_ms"]), file=sys.stderr)
+
+    if args.rounds < 1:
+        parser.error("--rounds needs a count of at least 1")
+    current = run(args.repeat, args.rounds, args.corpus or CORPORA, log)
+
+    text = json.dumps(current, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        problems = compare(current, baseline, args.tolerance)
+        for problem in problems:
+            print("regression: " + problem, file=sys.stderr)
+        if problems:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,7 @@
+from .grid import SIZE, BOX, CELLS, EMPTY, DIGITS, parse, format_grid, is_consistent, is_solved
+from .solver import BacktrackSolver, SearchStats, Step, Interrupted, CANDIDATE_MODES, HEURISTICS
+from .propagation import PropagatingSolver, CandidateGrid, Contradiction, TECHNIQUES, ADVANCED_TECHNIQUES
+from .dlx import DancingLinksSolver
+from .engine import SOLVERS, make_solver, solve, count_solutions, all_solutions
+from .generator import SYMMETRIES, generate
+from .rating import Rating, BANDS, rate, band_of, generate_rated
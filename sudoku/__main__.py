@@ -0,0 +1,204 @@
+""" Command line puzzle pipeline. Puzzles are read and written as 81 character
+    lines (digits for givens, '.' or '0' for empty cells), one per line. Other board
+    sizes are lines of 16, 256 or 625 characters, with letters for digits from 10 up.
+
+    python -m sudoku solve [FILE ...]        solve puzzles from files or stdin
+    python -m sudoku generate -n COUNT       write COUNT new puzzles
+    python -m sudoku validate [FILE ...]     report whether each puzzle has one solution
+    python -m sudoku rate [FILE ...]         grade puzzles by the techniques they need
+    python -m sudoku serve --socket PATH     run the JSON solving service (see sudoku.service)
+"""
+import argparse
+import asyncio
+import fileinput
+import json
+import sys
+
+from .grid import BOX, BOX_SIZES, CELLS, parse, format_grid, is_consistent
+from .solver import SearchStats
+from .engine import SOLVERS, solve, count_solutions
+from .cache import SolutionCache
+from .generator import SYMMETRIES
+from .parallel import solve_many, generate_many
+from .rating import rate, band_of
+from .service import SolveService, serve
+
+
+def read_puzzles(files, errors: list):
+    """ Lazily yields (line number, grid) for every puzzle line of files ('-' or none for stdin).
+        Blank lines and lines starting with '#' are skipped, unreadable ones are added to errors
+    """
+    with fileinput.input(files or ["-"]) as lines:
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                yield fileinput.lineno(), parse(line)
+            except ValueError as e:
+                errors.append("line %d: %s" % (fileinput.lineno(), e))
+
+
+def report(errors: list) -> int:
+    for error in errors:
+        print("sudoku: " + error, file=sys.stderr)
+
+    return 1 if errors else 0
+
+
+def command_solve(args) -> int:
+    errors = []
+    puzzles = read_puzzles(args.files, errors)
+    options = {"solver": args.solver}
+
+    if args.stats:
+        def traced():
+            for number, grid in puzzles:
+                stats = SearchStats()
+                solution = solve(grid, stats=stats, **options)
+                print(json.dumps(dict(line=number, **stats.as_dict())), file=sys.stderr)
+                yield number, solution
+
+        results = traced()
+    elif args.cache:
+        cache = SolutionCache(args.cache, **options)
+        # the cache's canonical forms are 9x9 only, other sizes are solved as they come
+        results = ((number, cache.solve(grid) if len(grid) == CELLS else solve(grid, **options))
+                   for number, grid in puzzles)
+    elif args.jobs == 1:
+        results = ((number, solve(grid, **options)) for number, grid in puzzles)
+    else:
+        # solve_many numbers puzzles from 0, map those back onto line numbers
+        numbers = {}
+
+        def tagged():
+            for i, (number, grid) in enumerate(puzzles):
+                numbers[i] = number
+                yield grid
+
+        results = ((numbers.pop(i), solution) for i, solution in solve_many(tagged(), args.jobs, **options))
+
+    for number, solution in results:
+        if solution is None:
+            errors.append("line %d: no solution" % number)
+        else:
+            sys.stdout.write(format_grid(solution) + "\n")
+
+    if args.cache:
+        print(json.dumps(cache.stats.as_dict()), file=sys.stderr)
+
+    return report(errors)
+
+
+def command_generate(args) -> int:
+    options = {"unique": not args.allow_multiple, "symmetry": args.symmetry, "box": args.box}
+    for _, puzzle in generate_many(args.count, args.clues, args.seed, args.jobs, reuse=args.reuse, **options):
+        sys.stdout.write(format_grid(puzzle) + "\n")
+
+    return 0
+
+
+def command_validate(args) -> int:
+    errors = []
+    status = 0
+    for number, grid in read_puzzles(args.files, errors):
+        if not is_consistent(grid):
+            verdict = "invalid"
+        else:
+            verdict = ("unsolvable", "unique", "multiple")[count_solutions(grid, 2)]
+        if verdict != "unique":
+            status = 1
+        sys.stdout.write("%s %s\n" % (format_grid(grid), verdict))
+
+    return report(errors) or status
+
+
+def command_rate(args) -> int:
+    errors = []
+    for _, grid in read_puzzles(args.files, errors):
+        rating = rate(grid)
+        sys.stdout.write("%s %.1f %s %s %d\n" % (format_grid(grid), rating.score, band_of(rating.score) or "-",
+                                                 rating.hardest, rating.steps))
+
+    return report(errors)
+
+
+def command_serve(args) -> int:
+    service = SolveService(args.jobs, args.queue, args.timeout)
+    try:
+        asyncio.run(serve(service, args.socket, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m sudoku", description="Sudoku puzzle pipeline")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    solve_parser = commands.add_parser("solve", help="solve puzzles, writing one solution line per puzzle")
+    solve_parser.add_argument("files", nargs="*", help="puzzle files, stdin when none or '-'")
+    solve_parser.add_argument("--solver", choices=sorted(SOLVERS), default="propagate")
+    solve_parser.add_argument("-j", "--jobs", type=int, default=1, help="worker processes, 0 for all cores")
+    solve_parser.add_argument("--stats", action="store_true",
+                              help="write the search statistics of each puzzle to stderr as a JSON line")
+    solve_parser.add_argument("--cache", type=int, default=0, metavar="SIZE",
+                              help="reuse the solutions of up to SIZE puzzles for repeated and symmetric "
+                                   "inputs of 9x9 puzzles, writing the cache metrics to stderr at the end. "
+                                   "Solves in-process")
+    solve_parser.set_defaults(run=command_solve)
+
+    generate_parser = commands.add_parser("generate", help="write new puzzles")
+    generate_parser.add_argument("-n", "--count", type=int, default=1)
+    generate_parser.add_argument("-c", "--clues", type=int, default=30, help="target number of givens")
+    generate_parser.add_argument("-s", "--seed", type=int, default=0)
+    generate_parser.add_argument("--symmetry", choices=SYMMETRIES, default="none")
+    generate_parser.add_argument("--box", type=int, choices=BOX_SIZES, default=BOX,
+                                 help="box size: 2 for 4x4 boards, 3 for 9x9, 4 for 16x16, 5 for 25x25")
+    generate_parser.add_argument("--reuse", type=int, default=1,
+                                 help="puzzles made from symmetries of each filled grid: faster, less varied")
+    generate_parser.add_argument("--allow-multiple", action="store_true",
+                                 help="skip the check that each puzzle has exactly one solution")
+    generate_parser.add_argument("-j", "--jobs", type=int, default=1, help="worker processes, 0 for all cores")
+    generate_parser.set_defaults(run=command_generate)
+
+    validate_parser = commands.add_parser("validate", help="classify puzzles as unique, multiple, "
+                                                           "unsolvable or invalid")
+    validate_parser.add_argument("files", nargs="*", help="puzzle files, stdin when none or '-'")
+    validate_parser.set_defaults(run=command_validate)
+
+    rate_parser = commands.add_parser("rate", help="write each puzzle with its score, band, hardest "
+                                                   "technique and step count")
+    rate_parser.add_argument("files", nargs="*", help="puzzle files, stdin when none or '-'")
+    rate_parser.set_defaults(run=command_rate)
+
+    serve_parser = commands.add_parser("serve", help="accept solve and generate jobs as JSON lines "
+                                                     "over a Unix socket or TCP")
+    serve_parser.add_argument("--socket", metavar="PATH", help="listen on a Unix socket instead of TCP")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8765)
+    serve_parser.add_argument("-j", "--jobs", type=int, default=0, help="worker processes, 0 for all cores")
+    serve_parser.add_argument("--queue", type=int, default=64, help="jobs that can wait before new ones are "
+                                                                    "rejected")
+    serve_parser.add_argument("--timeout", type=float, default=30.0, help="seconds a job may run for unless "
+                                                                         "its request says otherwise")
+    serve_parser.set_defaults(run=command_serve)
+
+    args = parser.parse_args(argv)
+    if getattr(args, "stats", False) and args.jobs != 1:
+        parser.error("--stats needs -j 1")
+    if getattr(args, "reuse", 1) < 1:
+        parser.error("--reuse needs a count of at least 1")
+    if getattr(args, "reuse", 1) > 1 and args.box != BOX:
+        parser.error("--reuse only works with --box %d" % BOX)
+    try:
+        return args.run(args)
+    except BrokenPipeError:
+        # the reader went away, e.g. piped into head
+        sys.stderr.close()
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
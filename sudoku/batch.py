@@ -0,0 +1,109 @@
+import numpy as np
+
+from .grid import CELLS, SIZE, EMPTY, UNITS, PEERS, ALL_DIGITS, POPCOUNT
+from .engine import solve
+
+UNIT_INDEX = np.array(UNITS, dtype=np.intp)
+PEER_INDEX = np.array(PEERS, dtype=np.intp)
+# for each of the row, column and box groups of units, where each cell ends up
+# when the group's (unit, position) pairs are laid out in order
+GROUP_ORDER = [np.argsort(UNIT_INDEX[g * SIZE:(g + 1) * SIZE].ravel()) for g in range(3)]
+
+POPCOUNT_TABLE = np.array(POPCOUNT, dtype=np.uint8)
+# the digit held by a single candidate mask, 0 for any other mask
+DIGIT_TABLE = np.zeros(ALL_DIGITS + 1, dtype=np.int8)
+for _d in range(1, SIZE + 1):
+    DIGIT_TABLE[1 << (_d - 1)] = _d
+
+# boards propagated together. A sweep makes (rows, 81, 20) temporaries, so larger
+# inputs are solved a block at a time to keep memory flat
+BLOCK_ROWS = 8192
+
+
+def candidate_masks(puzzles: np.ndarray) -> np.ndarray:
+    """ uint16 candidate masks for a (N, 81) array of puzzles. Givens get their own bit,
+        empty cells start with every digit
+    """
+    values = puzzles.astype(np.int64)
+    bits = np.left_shift(1, np.maximum(values - 1, 0)).astype(np.uint16)
+    return np.where(values == EMPTY, np.uint16(ALL_DIGITS), bits)
+
+
+def propagate_batch(cands: np.ndarray) -> np.ndarray:
+    """ Runs naked and hidden singles on every board at once, updating cands in place
+        until nothing changes.
+        :returns a bool array marking the boards that hit a contradiction
+    """
+    n = cands.shape[0]
+    failed = np.zeros(n, dtype=bool)
+    active = np.arange(n)
+
+    while active.size:
+        c = cands[active]
+        before = c.copy()
+
+        # naked singles: a cell down to one candidate removes it from all of its peers
+        single = POPCOUNT_TABLE[c] == 1
+        fixed = np.where(single, c, 0)
+        taken = np.bitwise_or.reduce(fixed[:, PEER_INDEX], axis=2)
+        c = np.where(single, c, c & ~taken)
+        # two peers fixed to the same digit wipe each other out
+        c = np.where(single & (c & taken != 0), 0, c)
+
+        # hidden singles: a digit that fits only one cell of a unit goes there
+        units = c[:, UNIT_INDEX]
+        once = np.zeros(units.shape[:2], dtype=np.uint16)
+        more = np.zeros(units.shape[:2], dtype=np.uint16)
+        for pos in range(SIZE):
+            more |= once & units[:, :, pos]
+            once |= units[:, :, pos]
+        bad = (once != ALL_DIGITS).any(axis=1)
+
+        hidden = units & (once & ~more)[:, :, None]
+        forced = np.zeros_like(c)
+        for g in range(3):
+            forced |= hidden[:, g * SIZE:(g + 1) * SIZE, :].reshape(len(c), CELLS)[:, GROUP_ORDER[g]]
+        c = np.where(forced != 0, forced, c)
+
+        bad |= (c == 0).any(axis=1) | (POPCOUNT_TABLE[forced] > 1).any(axis=1)
+        cands[active] = c
+        failed[active[bad]] = True
+
+        changed = (c != before).any(axis=1) & ~bad
+        active = active[changed]
+
+    return failed
+
+
+def solve_block(puzzles: np.ndarray, solutions: np.ndarray):
+    """ Solves a block of at most BLOCK_ROWS puzzles into solutions, an int8 array of the same shape """
+    cands = candidate_masks(puzzles)
+    failed = propagate_batch(cands)
+
+    solutions[:] = DIGIT_TABLE[cands]
+    solutions[failed] = EMPTY
+
+    # the rest need guessing, which does not vectorize
+    for row in np.flatnonzero(~failed & (solutions == EMPTY).any(axis=1)):
+        solution = solve(solutions[row].tolist())
+        solutions[row] = solution if solution is not None else EMPTY
+
+
+def solve_batch(puzzles: np.ndarray) -> np.ndarray:
+    """ Solves many puzzles at once.
+        Candidate elimination runs across each block of BLOCK_ROWS boards with NumPy;
+        only the boards that are still open afterwards are searched one at a time.
+        :param puzzles (N, 81) int array, EMPTY for unknown cells
+        :returns (N, 81) int8 array of solutions. Rows for puzzles without a solution are all EMPTY
+    """
+    puzzles = np.asarray(puzzles)
+    if puzzles.ndim != 2 or puzzles.shape[1] != CELLS:
+        raise ValueError("Expected an array of shape (N, %d), got %r" % (CELLS, puzzles.shape))
+    if ((puzzles < 0) | (puzzles > SIZE)).any():
+        raise ValueError("Cell values must be between 0 and %d" % SIZE)
+
+    solutions = np.empty(puzzles.shape, dtype=np.int8)
+    for start in range(0, len(puzzles), BLOCK_ROWS):
+        solve_block(puzzles[start:start + BLOCK_ROWS], solutions[start:start + BLOCK_ROWS])
+
+    return solutions
@@ -0,0 +1,165 @@
+import dbm
+from collections import OrderedDict
+from threading import Lock
+from time import perf_counter
+
+from .grid import check_grid
+from .engine import solve
+from .symmetry import canonical_form
+from .store import pack, unpack
+
+# stored for puzzles without a solution, so they are not searched again either
+NO_SOLUTION = b""
+
+
+class CacheStats:
+    """ Counters kept by a SolutionCache """
+
+    def __init__(self):
+        self.hits = 0
+        # the hits on the exact puzzle, found without canonicalizing. Counted in hits too
+        self.exact_hits = 0
+        self.spill_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # seconds spent canonicalizing and looking up, and solving on a miss
+        self.lookup_time = 0.0
+        self.solve_time = 0.0
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.spill_hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        """ The fraction of lookups answered from memory or the spill file """
+        return (self.hits + self.spill_hits) / self.lookups if self.lookups else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "hits": self.hits,
+            "exact_hits": self.exact_hits,
+            "spill_hits": self.spill_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate,
+            "mean_lookup": self.lookup_time / self.lookups if self.lookups else 0.0,
+            "solve_time": self.solve_time,
+        }
+
+    def __repr__(self):
+        return "CacheStats(%s)" % ", ".join("%s=%r" % item for item in self.as_dict().items())
+
+
+class SolutionCache:
+    """ Memoizes solve() for puzzles and every symmetric variant of them. A puzzle is
+        first looked up as it is, then canonicalized and its canonical form looked up,
+        the cached solution of the canonical puzzle being mapped back through the inverse
+        transform. Both are kept in a bounded LRU. Entries evicted from memory are kept
+        in a dbm file when spill is given, and promoted back on their next hit.
+
+        A repeated puzzle costs a dictionary lookup. Canonicalizing takes 10 to 20 ms,
+        more than the propagating solver takes on any of the benchmark corpora, so hits
+        on symmetric variants only pay off with the slower solvers, backtracking on hard
+        puzzles above all. Safe to share between threads
+    """
+
+    def __init__(self, capacity: int = 1024, spill: str = None, **options):
+        """ :param capacity the number of solutions kept in memory
+            :param spill optional path of a dbm file for evicted solutions
+            :param options passed on to solve() on a miss
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+
+        self.capacity = capacity
+        self.options = options
+        self.entries = OrderedDict()
+        self.spill = dbm.open(spill, "c") if spill is not None else None
+        self.stats = CacheStats()
+        self.lock = Lock()
+
+    def lookup(self, key: bytes):
+        """ The packed solution for a canonical key, None if it is not cached """
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.stats.hits += 1
+                return self.entries[key]
+
+            if self.spill is not None and key in self.spill:
+                value = self.spill[key]
+                self.stats.spill_hits += 1
+                self.insert(key, value)
+                return value
+
+        return None
+
+    def insert(self, key: bytes, value: bytes):
+        """ Caller holds the lock """
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.capacity:
+            old_key, old_value = self.entries.popitem(last=False)
+            self.stats.evictions += 1
+            if self.spill is not None:
+                self.spill[old_key] = old_value
+
+    def solve(self, grid):
+        """ Like engine.solve, but answered from the cache when a symmetric variant of grid was solved before
+            :returns the solved grid as a new list, or None if there is no solution
+        """
+        grid = check_grid(grid)
+        start = perf_counter()
+        # a puzzle and its solution are stored under the puzzle, whether it is a
+        # canonical form or was looked up as it is
+        exact = bytes(grid)
+        value = self.lookup(exact)
+        if value is not None:
+            with self.lock:
+                self.stats.exact_hits += 1
+                self.stats.lookup_time += perf_counter() - start
+            return None if value == NO_SOLUTION else unpack(value)
+
+        canonical, transform = canonical_form(grid)
+        key = bytes(canonical)
+        value = self.lookup(key)
+        with self.lock:
+            self.stats.lookup_time += perf_counter() - start
+
+        if value is None:
+            start = perf_counter()
+            solution = solve(canonical, **self.options)
+            value = NO_SOLUTION if solution is None else pack(solution)
+            with self.lock:
+                self.stats.solve_time += perf_counter() - start
+                self.stats.misses += 1
+                self.insert(key, value)
+
+        solution = None if value == NO_SOLUTION else transform.inverse().apply(unpack(value))
+        if exact != key:
+            with self.lock:
+                self.insert(exact, NO_SOLUTION if solution is None else pack(solution))
+        return solution
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def close(self):
+        """ Writes every entry still in memory to the spill file and closes it """
+        with self.lock:
+            if self.spill is not None:
+                for key, value in self.entries.items():
+                    self.spill[key] = value
+                self.spill.close()
+                self.spill = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
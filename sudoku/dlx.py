@@ -0,0 +1,183 @@
+from random import Random
+
+from .grid import CELLS, EMPTY, STANDARD, Geometry, check_grid, geometry_of
+from .solver import SearchSolver, SearchStats
+
+# exact cover columns: every cell is filled once, and every row, column and box
+# holds each digit once. COLUMNS is the count for a standard board
+COLUMNS = 4 * CELLS
+ROOT = 0
+
+
+def cover_columns(index: int, value: int, geometry: Geometry = STANDARD) -> tuple:
+    """ The four constraint columns (numbered from 1) satisfied by putting value in index """
+    g = geometry
+    d = value - 1
+    return (1 + index,
+            1 + g.cells + g.row_of[index] * g.size + d,
+            1 + 2 * g.cells + g.col_of[index] * g.size + d,
+            1 + 3 * g.cells + g.box_of[index] * g.size + d)
+
+
+class DancingLinksSolver(SearchSolver):
+    """ Solves sudoku as an exact cover problem with Knuth's Algorithm X, using
+        dancing links over flat lists. Node 0 is the root, nodes 1 to 4 * cells are the
+        column headers and every (cell, digit) choice adds a row of four nodes after those
+    """
+
+    def __init__(self, grid, random_select: bool = False, rng: Random = None, stats: SearchStats = None,
+                 interrupt=None):
+        """ :param grid 81 ints (or the cells of another Geometry), EMPTY for unknown cells.
+                The solver works on a copy
+            :param random_select if true then the rows of each column are tried in random order
+            :param rng the Random instance used by random_select
+            :param stats optional SearchStats to record the search in
+            :param interrupt optional callable polled during the search, returning True stops it with Interrupted
+        """
+        super().__init__(random_select, rng, stats, interrupt)
+        self.geometry = g = geometry_of(grid)
+        self.grid = check_grid(grid, g)
+
+        columns = 4 * g.cells
+        n = columns + 1
+        self.left = [i - 1 for i in range(n)]
+        self.right = [i + 1 for i in range(n)]
+        self.left[ROOT] = columns
+        self.right[columns] = ROOT
+        self.up = list(range(n))
+        self.down = list(range(n))
+        self.column = list(range(n))
+        self.size = [0] * n
+        # the (cell, digit) choice a node belongs to
+        self.choice = [None] * n
+
+        for index in range(g.cells):
+            for value in g.digits:
+                self.add_row(index, value)
+
+        # the givens are chosen before the search starts, a given that
+        # clashes with another leaves the problem without a cover
+        self.consistent = True
+        covered = set()
+        for index, value in enumerate(self.grid):
+            if value != EMPTY:
+                columns = cover_columns(index, value, g)
+                if covered.intersection(columns):
+                    self.consistent = False
+                    break
+                covered.update(columns)
+                for c in columns:
+                    self.cover(c)
+
+        self.install_stats()
+        self.install_interrupt()
+
+    def add_row(self, index: int, value: int):
+        left, right, up, down, column = self.left, self.right, self.up, self.down, self.column
+        first = len(left)
+        for offset, c in enumerate(cover_columns(index, value, self.geometry)):
+            node = first + offset
+            left.append(first + (offset - 1) % 4)
+            right.append(first + (offset + 1) % 4)
+            up.append(up[c])
+            down.append(c)
+            column.append(c)
+            self.choice.append((index, value))
+            down[up[c]] = node
+            up[c] = node
+            self.size[c] += 1
+
+    def cover(self, c: int):
+        left, right, up, down, column, size = self.left, self.right, self.up, self.down, self.column, self.size
+        right[left[c]] = right[c]
+        left[right[c]] = left[c]
+        i = down[c]
+        while i != c:
+            j = right[i]
+            while j != i:
+                down[up[j]] = down[j]
+                up[down[j]] = up[j]
+                size[column[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+    def uncover(self, c: int):
+        left, right, up, down, column, size = self.left, self.right, self.up, self.down, self.column, self.size
+        i = up[c]
+        while i != c:
+            j = left[i]
+            while j != i:
+                size[column[j]] += 1
+                down[up[j]] = j
+                up[down[j]] = j
+                j = left[j]
+            i = up[i]
+        right[left[c]] = c
+        left[right[c]] = c
+
+    def search(self) -> bool:
+        """ Covers the remaining columns.
+            :returns True once enough solutions were found to stop searching
+        """
+        self.nodes += 1
+        right, down, size = self.right, self.down, self.size
+
+        if right[ROOT] == ROOT:
+            return self.found()
+
+        # choosing the column with the fewest rows left
+        c = right[ROOT]
+        best = c
+        while c != ROOT:
+            if size[c] < size[best]:
+                best = c
+                if size[c] <= 1:
+                    break
+            c = right[c]
+        c = best
+        if size[c] == 0:
+            return False
+
+        rows = []
+        r = down[c]
+        while r != c:
+            rows.append(r)
+            r = down[r]
+        if self.random_select:
+            self.rng.shuffle(rows)
+
+        self.cover(c)
+        for r in rows:
+            index, value = self.choice[r]
+            self.grid[index] = value
+            if self.listeners:
+                self.emit("guess", index, value)
+
+            j = right[r]
+            while j != r:
+                self.cover(self.column[j])
+                j = right[j]
+
+            stop = self.search()
+
+            j = self.left[r]
+            while j != r:
+                self.uncover(self.column[j])
+                j = self.left[j]
+
+            if stop:
+                self.uncover(c)
+                return True
+
+            self.grid[index] = EMPTY
+            if self.listeners:
+                self.emit("clear", index, EMPTY)
+        self.uncover(c)
+
+        return False
+
+    def run(self) -> bool:
+        if not self.consistent:
+            return False
+
+        return self.search()
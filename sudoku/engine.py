@@ -0,0 +1,62 @@
+from .grid import check_grid, geometry_of, is_consistent
+from .solver import BacktrackSolver
+from .propagation import PropagatingSolver
+from .dlx import DancingLinksSolver
+
+# the solving engines that can be picked by name
+SOLVERS = {
+    "backtrack": BacktrackSolver,
+    "propagate": PropagatingSolver,
+    "dlx": DancingLinksSolver,
+}
+
+
+def make_solver(grid, solver: str = "propagate", **options):
+    """ Creates one of the SOLVERS for grid
+        :param options passed on to the solver's constructor
+    """
+    if solver not in SOLVERS:
+        raise ValueError("Unknown solver %r" % solver)
+
+    return SOLVERS[solver](grid, **options)
+
+
+def solve(grid, listener=None, **options):
+    """ Solves a puzzle without touching the input.
+        :param grid 81 ints (or the cells of another Geometry), EMPTY for unknown cells
+        :param listener optional callable passed every Step of the search
+        :param options passed on to make_solver
+        :returns the solved grid as a new list, or None if there is no solution
+    """
+    grid = check_grid(grid, geometry_of(grid))
+    if not is_consistent(grid):
+        return None
+
+    solver = make_solver(grid, **options)
+    if listener is not None:
+        solver.subscribe(listener)
+
+    if solver.solve():
+        return solver.grid
+
+    return None
+
+
+def count_solutions(grid, limit: int = 2, **options) -> int:
+    """ Counts the solutions of a puzzle, stopping once limit is reached.
+        Use limit=2 to check that a puzzle has exactly one solution
+    """
+    grid = check_grid(grid, geometry_of(grid))
+    if not is_consistent(grid):
+        return 0
+
+    return make_solver(grid, **options).count_solutions(limit)
+
+
+def all_solutions(grid, limit: int, **options) -> list:
+    """ Returns up to limit solutions of a puzzle as new lists """
+    grid = check_grid(grid, geometry_of(grid))
+    if not is_consistent(grid):
+        return []
+
+    return make_solver(grid, **options).all_solutions(limit)
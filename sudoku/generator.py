@@ -0,0 +1,188 @@
+from random import Random
+
+from .grid import BOX, EMPTY, STANDARD, Geometry, check_grid, geometry, is_consistent
+from .solver import Step, Interrupted
+from .propagation import PropagatingSolver, Contradiction
+
+# patterns the removed cells of a generated puzzle can follow
+#   "none": cells are removed one at a time
+#   "rotational": a cell is removed along with its image under a half turn of the board
+#   "mirror": a cell is removed along with its image across the vertical centre line
+#   "diagonal": a cell is removed along with its image across the main diagonal
+SYMMETRIES = ("none", "rotational", "mirror", "diagonal")
+
+# the uniqueness checks run thousands of short searches, where the cheaper
+# inference rules pay for themselves and the pair/intersection ones do not
+CHECK_TECHNIQUES = ("hidden_singles",)
+# on boards bigger than the standard one, a uniqueness check gives up after this many
+# search nodes and keeps the cell. That bounds the time spent proving a sparse puzzle
+# has no second solution, at the cost of a few more clues
+CHECK_NODES = 64
+# the search nodes per cell a random fill may take before it is restarted. The
+# standard board needs under one, big boards have a thin tail of fills that need many
+RESTART_NODES = 2
+
+
+def symmetry_orbits(symmetry: str, geometry: Geometry = STANDARD) -> list:
+    """ Splits the cells into groups that have to be removed together under symmetry """
+    if symmetry not in SYMMETRIES:
+        raise ValueError("Unknown symmetry %r" % symmetry)
+
+    size, cells = geometry.size, geometry.cells
+    orbits = []
+    seen = set()
+    for i in range(cells):
+        if i in seen:
+            continue
+        r, c = divmod(i, size)
+        if symmetry == "rotational":
+            image = cells - 1 - i
+        elif symmetry == "mirror":
+            image = r * size + size - 1 - c
+        elif symmetry == "diagonal":
+            image = c * size + r
+        else:
+            image = i
+        orbit = tuple(sorted({i, image}))
+        seen.update(orbit)
+        orbits.append(orbit)
+
+    return orbits
+
+
+def random_solution(rng: Random = None, listener=None, interrupt=None, geometry: Geometry = STANDARD) -> list:
+    """ A complete grid found by solving the empty board with randomly ordered guesses.
+        A fill that runs past RESTART_NODES search nodes per cell is started over with
+        fresh guesses, rather than left to backtrack out of an early mistake
+    """
+    # an empty 9x9 board never needs more than naked singles to stay on track,
+    # bigger ones wander into dead ends far less often with hidden singles
+    techniques = () if geometry.size <= STANDARD.size else ("hidden_singles",)
+    budget = RESTART_NODES * geometry.cells
+
+    while True:
+        solver = PropagatingSolver([EMPTY] * geometry.cells, random_select=True, rng=rng, techniques=techniques,
+                                   interrupt=lambda: solver.nodes > budget or interrupt is not None and interrupt())
+        if listener is not None:
+            solver.subscribe(listener)
+        try:
+            solver.solve()
+            return solver.grid
+        except Interrupted:
+            if interrupt is not None and interrupt():
+                raise
+
+
+def solution_grids(rng: Random = None, reuse: int = 1, interrupt=None, box: int = BOX):
+    """ Endless complete grids. Each random fill is followed by reuse - 1 random symmetries
+        of it (digits relabelled, bands, stacks and the lines within them reordered, the
+        board transposed), which take a small fraction of the time of a fill. A higher
+        reuse trades diversity, as the grids come in runs from one equivalence class,
+        for speed. 1 fills every grid
+        :param box the box size of the board. Symmetries are only defined for the standard
+            one, so other sizes need a reuse of 1
+    """
+    if reuse < 1:
+        raise ValueError("reuse must be at least 1")
+    if reuse > 1 and box != STANDARD.box:
+        raise ValueError("Grids can only be reused on %dx%d boards" % (STANDARD.size, STANDARD.size))
+
+    # imported here, as the symmetry tables are built with NumPy, which importing
+    # sudoku does not load
+    from .symmetry import random_transform
+
+    rng = rng if rng is not None else Random()
+    board = geometry(box)
+    while True:
+        solution = random_solution(rng, interrupt=interrupt, geometry=board)
+        yield solution
+        for _ in range(reuse - 1):
+            yield random_transform(rng).apply(solution)
+
+
+def has_other_solution(puzzle, solution, index: int, interrupt=None, budget: int = None) -> bool:
+    """ True if puzzle has a solution that puts something other than solution[index] in index.
+        :param budget optional limit on the search nodes. A search that runs out of them
+            answers True, as another solution has not been ruled out
+    """
+    solver = PropagatingSolver(puzzle, techniques=CHECK_TECHNIQUES,
+                               interrupt=lambda: budget is not None and solver.nodes > budget or
+                               interrupt is not None and interrupt())
+    try:
+        solver.board.eliminate(index, solver.geometry.bit[solution[index]])
+    except Contradiction:
+        return False
+
+    try:
+        return solver.solve()
+    except Interrupted:
+        if interrupt is not None and interrupt():
+            raise
+        return True
+
+
+def generate(clues: int = 51, rng: Random = None, listener=None, unique: bool = True,
+             symmetry: str = "none", accept=None, interrupt=None, box: int = BOX, solution=None) -> list:
+    """ Creates a puzzle by filling an empty board with randomly ordered guesses,
+        then emptying cells in random order until only clues of them remain filled.
+        :param listener optional callable passed the Steps of the fill, followed
+            by a Step("remove", index, EMPTY) for every cell emptied
+        :param unique if true then a cell is only emptied when the puzzle keeps exactly one
+            solution, so the result can have more than clues filled cells when no further
+            cell can go
+        :param symmetry one of SYMMETRIES, the pattern the emptied cells follow
+        :param accept optional callable given the grid after each removal, returning
+            False puts the cells back (used to keep within a difficulty band)
+        :param interrupt optional callable polled while generating, returning True stops
+            generation by raising Interrupted
+        :param box the box size of the board, 3 for the standard 9x9 one
+        :param solution optional complete grid to empty cells of instead of filling a new
+            one, from solution_grids for instance. The listener is passed an "infer" Step
+            for each of its cells
+    """
+    board = geometry(box)
+    if not 0 <= clues <= board.cells:
+        raise ValueError("clues must be between 0 and %d" % board.cells)
+
+    rng = rng if rng is not None else Random()
+    orbits = symmetry_orbits(symmetry, board)
+    if solution is None:
+        solution = random_solution(rng, listener, interrupt, board)
+    else:
+        solution = check_grid(solution, board)
+        if EMPTY in solution or not is_consistent(solution):
+            raise ValueError("solution must be a complete, consistent grid")
+        if listener is not None:
+            for index, value in enumerate(solution):
+                listener(Step("infer", index, value))
+    grid = list(solution)
+
+    budget = CHECK_NODES if board.size > STANDARD.size else None
+    rng.shuffle(orbits)
+    filled = board.cells
+    for orbit in orbits:
+        if filled - len(orbit) < clues:
+            continue
+        if interrupt is not None and interrupt():
+            raise Interrupted()
+
+        for index in orbit:
+            grid[index] = EMPTY
+
+        # the puzzle had one solution before these cells were emptied, so any
+        # other solution now has to differ from it in one of them. That is a much
+        # cheaper question than counting the solutions from scratch
+        if unique and any(has_other_solution(grid, solution, index, interrupt, budget) for index in orbit) or \
+                accept is not None and not accept(grid):
+            for index in orbit:
+                grid[index] = solution[index]
+            continue
+
+        filled -= len(orbit)
+        if listener is not None:
+            for index in orbit:
+                listener(Step("remove", index, EMPTY))
+        if filled == clues:
+            break
+
+    return grid
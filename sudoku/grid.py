@@ -0,0 +1,173 @@
+# A board is a flat list of SIZE * SIZE ints in row-major order. Empty cells hold
+# EMPTY, filled cells hold their digit. The standard board has SIZE = 9; a Geometry
+# describes boards of any box size, and the module level tables are those of the
+# standard one.
+
+EMPTY = 0
+# the characters digits 1, 2, ... are written as, so boxes of up to 5 x 5 fit on one line
+DIGIT_CHARS = "123456789ABCDEFGHIJKLMNOP"
+BOX_SIZES = (2, 3, 4, 5)
+
+
+class MaskTable(dict):
+    """ A lookup from candidate mask to value filled in on first use, standing in for a
+        precomputed tuple when the boards are too big for one of every mask
+    """
+
+    def __init__(self, compute):
+        super().__init__()
+        self.compute = compute
+
+    def __missing__(self, mask: int):
+        value = self[mask] = self.compute(mask)
+        return value
+
+
+class Geometry:
+    """ The cells, units and candidate masks of a board with box x box boxes, box * box
+        rows, columns and digits. Solvers look everything up here, so one code path
+        handles 4x4 up to 25x25 boards
+    """
+
+    def __init__(self, box: int):
+        if box not in BOX_SIZES:
+            raise ValueError("Unsupported box size %r" % box)
+
+        size = box * box
+        cells = size * size
+        self.box = box
+        self.size = size
+        self.cells = cells
+        self.digits = tuple(range(1, size + 1))
+
+        self.row_of = tuple(i // size for i in range(cells))
+        self.col_of = tuple(i % size for i in range(cells))
+        self.box_of = tuple(self.row_of[i] // box * box + self.col_of[i] // box for i in range(cells))
+
+        self.rows = tuple(tuple(r * size + c for c in range(size)) for r in range(size))
+        self.cols = tuple(tuple(r * size + c for r in range(size)) for c in range(size))
+        self.boxes = tuple(tuple(i for i in range(cells) if self.box_of[i] == b) for b in range(size))
+        self.units = self.rows + self.cols + self.boxes
+        self.lines = self.rows + self.cols
+        # the positions in units of the row, column and box of each cell
+        self.units_of = tuple((self.row_of[i], size + self.col_of[i], 2 * size + self.box_of[i]) for i in range(cells))
+
+        # every other cell sharing a row, column or box with the cell
+        self.peers = tuple(tuple(sorted(set(self.rows[self.row_of[i]] + self.cols[self.col_of[i]] +
+                                            self.boxes[self.box_of[i]]) - {i}))
+                           for i in range(cells))
+        self.peer_sets = tuple(frozenset(peers) for peers in self.peers)
+
+        # candidate sets as size bit masks: digit d is bit d - 1
+        self.all_digits = (1 << size) - 1
+        self.bit = (0,) + tuple(1 << (d - 1) for d in self.digits)
+        if size <= 9:
+            self.popcount = tuple(bin(m).count("1") for m in range(self.all_digits + 1))
+            self.mask_digits = tuple(self.digits_of(m) for m in range(self.all_digits + 1))
+        else:
+            self.popcount = MaskTable(int.bit_count)
+            self.mask_digits = MaskTable(self.digits_of)
+
+    def digits_of(self, mask: int) -> tuple:
+        return tuple(d for d in self.digits if mask & self.bit[d])
+
+    def __repr__(self):
+        return "Geometry(%d)" % self.box
+
+
+STANDARD = Geometry(3)
+GEOMETRIES = {3: STANDARD}
+
+
+def geometry(box: int) -> Geometry:
+    """ The Geometry of boards with box x box boxes, built once per size """
+    if box not in GEOMETRIES:
+        GEOMETRIES[box] = Geometry(box)
+
+    return GEOMETRIES[box]
+
+
+def geometry_of(grid) -> Geometry:
+    """ The Geometry of a board of len(grid) cells """
+    for box in BOX_SIZES:
+        if len(grid) == box ** 4:
+            return geometry(box)
+
+    raise ValueError("Expected %s cells, got %d" % (", ".join(str(box ** 4) for box in BOX_SIZES), len(grid)))
+
+
+SIZE = STANDARD.size
+BOX = STANDARD.box
+CELLS = STANDARD.cells
+DIGITS = STANDARD.digits
+
+ROW_OF = STANDARD.row_of
+COL_OF = STANDARD.col_of
+BOX_OF = STANDARD.box_of
+
+ROWS = STANDARD.rows
+COLS = STANDARD.cols
+BOXES = STANDARD.boxes
+UNITS = STANDARD.units
+PEERS = STANDARD.peers
+
+ALL_DIGITS = STANDARD.all_digits
+BIT = STANDARD.bit
+POPCOUNT = STANDARD.popcount
+MASK_DIGITS = STANDARD.mask_digits
+
+
+def parse(text: str) -> list:
+    """ Parses a puzzle line into a grid, the board size following from its length
+        (81 characters for a standard board). Digits, then letters from A for 10 up,
+        are givens, '0' and '.' are empty cells. Whitespace is ignored
+    """
+    chars = "".join(text.split())
+    size = geometry_of(chars).size
+
+    grid = []
+    for ch in chars:
+        if ch in ".0":
+            grid.append(EMPTY)
+        elif ch.upper() in DIGIT_CHARS[:size]:
+            grid.append(DIGIT_CHARS.index(ch.upper()) + 1)
+        else:
+            raise ValueError("Invalid cell character %r" % ch)
+
+    return grid
+
+
+def format_grid(grid) -> str:
+    """ Formats a grid as one line, using '.' for empty cells """
+    return "".join(DIGIT_CHARS[v - 1] if v != EMPTY else "." for v in grid)
+
+
+def check_grid(grid, geometry: Geometry = STANDARD) -> list:
+    """ Returns grid as a list after checking its shape and values """
+    grid = list(grid)
+    if len(grid) != geometry.cells:
+        raise ValueError("Expected %d cells, got %d" % (geometry.cells, len(grid)))
+    for v in grid:
+        if v != EMPTY and v not in geometry.digits:
+            raise ValueError("Invalid cell value %r" % v)
+
+    return grid
+
+
+def is_consistent(grid) -> bool:
+    """ True if no digit appears twice in any row, column or box """
+    for unit in geometry_of(grid).units:
+        seen = set()
+        for i in unit:
+            v = grid[i]
+            if v != EMPTY:
+                if v in seen:
+                    return False
+                seen.add(v)
+
+    return True
+
+
+def is_solved(grid) -> bool:
+    """ True if every cell is filled and the grid is consistent """
+    return EMPTY not in grid and is_consistent(grid)
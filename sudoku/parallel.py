@@ -0,0 +1,130 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
+from random import Random
+
+from .grid import BOX, SIZE
+from .engine import solve
+from .generator import generate, solution_grids
+
+# how many chunks per worker process are queued up ahead of the results being read
+CHUNKS_IN_FLIGHT = 4
+
+
+def task_rng(seed: int, index: int) -> Random:
+    """ The Random used by task index of a run seeded with seed. The same seed gives
+        the same results however the tasks are split between processes
+    """
+    return Random("%d:%d" % (seed, index))
+
+
+def solve_chunk(chunk: list, options: dict) -> list:
+    """ Worker side of solve_many """
+    return [(index, solve(grid, **options)) for index, grid in chunk]
+
+
+def generate_chunk(chunk: list, seed: int, clues: int, reuse: int, options: dict) -> list:
+    """ Worker side of generate_many """
+    if reuse == 1:
+        return [(index, generate(clues, rng=task_rng(seed, index), **options)) for index in chunk]
+
+    # imported here like in solution_grids, keeping NumPy out of plain generation
+    from .symmetry import random_transform
+
+    # puzzle i is made from a random symmetry of the grid filled for group i // reuse,
+    # so it is the same whichever chunk the rest of its group lands in. Fills take
+    # negative task numbers to stay apart from the puzzles' own
+    fills = {}
+    results = []
+    for index in chunk:
+        group = index // reuse
+        if group not in fills:
+            fills[group] = next(solution_grids(task_rng(seed, -1 - group)))
+        rng = task_rng(seed, index)
+        results.append((index, generate(clues, rng=rng, solution=random_transform(rng).apply(fills[group]),
+                                        **options)))
+
+    return results
+
+
+def chunked(items, size: int):
+    items = iter(items)
+    while True:
+        chunk = list(islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run_chunks(worker, chunks, args: tuple, processes: int = None, ordered: bool = True):
+    """ Runs worker(chunk, *args) for every chunk on a pool of processes, yielding the
+        items of each returned list. Only a few chunks per process are read ahead of
+        the results, so chunks can come from an endless or very large generator.
+        :param processes the number of worker processes, all cores when None. With 1
+            everything runs in this process
+        :param ordered if true then results come out in chunk order, otherwise as they complete
+    """
+    processes = processes or os.cpu_count() or 1
+    if processes == 1:
+        for chunk in chunks:
+            yield from worker(chunk, *args)
+        return
+
+    chunks = iter(chunks)
+    with ProcessPoolExecutor(processes) as pool:
+        pending = deque()
+
+        def submit() -> bool:
+            chunk = next(chunks, None)
+            if chunk is None:
+                return False
+            pending.append(pool.submit(worker, chunk, *args))
+            return True
+
+        for _ in range(processes * CHUNKS_IN_FLIGHT):
+            if not submit():
+                break
+
+        while pending:
+            if ordered:
+                done = [pending.popleft()]
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pending.remove(future)
+
+            for future in done:
+                yield from future.result()
+                submit()
+
+
+def solve_many(puzzles, processes: int = None, chunksize: int = 64, ordered: bool = True, **options):
+    """ Solves puzzles across a pool of processes.
+        :param puzzles any iterable of grids, read lazily
+        :param options passed on to solve (solver, heuristic, ...)
+        :returns a generator of (index, solution) pairs, solution being None for puzzles
+            without one
+    """
+    return run_chunks(solve_chunk, chunked(enumerate(puzzles), chunksize), (options,), processes, ordered)
+
+
+def generate_many(count: int, clues: int = 51, seed: int = 0, processes: int = None, chunksize: int = 8,
+                  ordered: bool = True, reuse: int = 1, **options):
+    """ Generates count puzzles across a pool of processes. Puzzle i is always made
+        from task_rng(seed, i), so a run can be repeated exactly.
+        :param reuse how many puzzles are made from symmetries of each randomly filled
+            grid (see solution_grids). 1 fills a grid for every puzzle. chunksize is rounded
+            up to a multiple of it
+        :param options passed on to generate (unique, symmetry)
+        :returns a generator of (index, puzzle) pairs
+    """
+    if reuse < 1:
+        raise ValueError("reuse must be at least 1")
+    if reuse > 1 and options.get("box", BOX) != BOX:
+        raise ValueError("Grids can only be reused on %dx%d boards" % (SIZE, SIZE))
+    # chunks hold whole groups of reuse puzzles, so each grid is filled only once
+    chunksize = -(-chunksize // reuse) * reuse
+
+    return run_chunks(generate_chunk, chunked(range(count), chunksize), (seed, clues, reuse, options), processes,
+                      ordered)
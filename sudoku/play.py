@@ -0,0 +1,241 @@
+from collections import namedtuple
+from time import monotonic
+
+from .grid import EMPTY, check_grid, geometry_of
+from .solver import Interrupted
+from .engine import all_solutions
+
+# what a PlayBoard says about the position after a move
+#   "solved": every cell is filled and nothing clashes
+#   "unique": the position can still be completed, in exactly one way
+#   "multiple": the position can be completed in more than one way
+#   "unsolvable": a digit clashes with another or the position has no completion
+#   "unknown": the search for completions ran out of time before it could tell
+STATUSES = ("solved", "unique", "multiple", "unsolvable", "unknown")
+
+# the answer to a move: conflicts are the cells sharing a unit with index that hold
+# the same digit, candidates the digits index could take without a clash (from the
+# other filled cells only), status one of STATUSES for the position after the move
+Move = namedtuple("Move", "index value conflicts candidates status")
+
+
+class PlayBoard:
+    """ A puzzle being played. Per unit digit counts and candidate masks are updated on
+        every placement, so conflicts and the candidates of a cell cost a few lookups
+        rather than a scan of the board.
+
+        The solutions of the givens are searched for once, up front. When there is
+        exactly one, a position is still solvable exactly when every entry agrees with
+        it, which a count of disagreeing entries answers in constant time. Puzzles with
+        several solutions, or none, search the position again after each move that
+        asks for its status. Every search stops after search_time seconds, leaving the
+        status "unknown"
+    """
+
+    def __init__(self, puzzle, search_time: float = None, **options):
+        """ :param puzzle the givens, 81 ints (or the cells of another Geometry) with EMPTY
+                for the cells to play
+            :param search_time optional limit on the seconds each search for solutions takes
+            :param options passed on to the solver that looks for solutions
+        """
+        self.geometry = g = geometry_of(puzzle)
+        puzzle = check_grid(puzzle, g)
+        self.search_time = search_time
+        self.options = options
+        self.grid = [EMPTY] * g.cells
+        self.givens = frozenset(i for i, v in enumerate(puzzle) if v != EMPTY)
+        self.filled = 0
+
+        # counts[u * (size + 1) + d] is how many times digit d is in unit u, masks[u]
+        # the digits in unit u, clashes how many (unit, digit) pairs have a count above 1
+        self.stride = g.size + 1
+        self.counts = [0] * (len(g.units) * self.stride)
+        self.masks = [0] * len(g.units)
+        self.clashes = 0
+        for index in self.givens:
+            self.put(index, puzzle[index])
+
+        # the one solution of the givens, None when there are several, none or the search gave up
+        self.solution = None
+        if self.clashes:
+            self.givens_status = "unsolvable"
+        elif not self.givens:
+            # an empty board has plenty of solutions, no need to find two
+            self.givens_status = "multiple"
+        else:
+            solutions = self.solutions(puzzle)
+            if solutions is None:
+                self.givens_status = "unknown"
+            else:
+                self.solution = solutions[0] if len(solutions) == 1 else None
+                self.givens_status = ("unsolvable", "unique", "multiple")[len(solutions)]
+        # how many entries differ from solution
+        self.wrong = 0
+        # the status of the position, worked out when first asked for
+        self.known_status = None
+
+    def solutions(self, grid) -> list:
+        """ Up to two solutions of grid, None if the search ran out of time """
+        if self.search_time is None:
+            return all_solutions(grid, 2, **self.options)
+
+        deadline = monotonic() + self.search_time
+        try:
+            return all_solutions(grid, 2, interrupt=lambda: monotonic() > deadline, **self.options)
+        except Interrupted:
+            return None
+
+    def put(self, index: int, value: int):
+        """ Writes value into index, keeping the counts and masks in step """
+        g = self.geometry
+        old = self.grid[index]
+        if old == value:
+            return
+
+        counts, masks, stride = self.counts, self.masks, self.stride
+        if old != EMPTY:
+            for u in g.units_of[index]:
+                k = u * stride + old
+                counts[k] -= 1
+                if counts[k] == 1:
+                    self.clashes -= 1
+                elif counts[k] == 0:
+                    masks[u] &= ~g.bit[old]
+            self.filled -= 1
+        if value != EMPTY:
+            for u in g.units_of[index]:
+                k = u * stride + value
+                counts[k] += 1
+                if counts[k] == 2:
+                    self.clashes += 1
+                masks[u] |= g.bit[value]
+            self.filled += 1
+
+        self.grid[index] = value
+        self.known_status = None
+
+    def validate(self, index: int, value: int):
+        """ Raises ValueError unless index is a cell and value EMPTY or a digit """
+        g = self.geometry
+        if not 0 <= index < g.cells:
+            raise ValueError("Cell index %r out of range" % index)
+        if value != EMPTY and value not in g.digits:
+            raise ValueError("Invalid cell value %r" % value)
+
+    def write(self, index: int, value: int):
+        """ Plays value (EMPTY to clear the cell) into index, without working out what
+            that leads to. Raises ValueError for a given, unless value is the given's own digit
+        """
+        self.validate(index, value)
+        if index in self.givens:
+            if value != self.grid[index]:
+                raise ValueError("Cell %d is a given" % index)
+            return
+
+        if self.solution is not None:
+            old = self.grid[index]
+            self.wrong += (value != EMPTY and value != self.solution[index]) - \
+                (old != EMPTY and old != self.solution[index])
+        self.put(index, value)
+
+    def place(self, index: int, value: int) -> Move:
+        """ Plays value into index like write, and answers with the resulting Move """
+        self.write(index, value)
+        return self.check(index, value)
+
+    def clear(self, index: int) -> Move:
+        return self.place(index, EMPTY)
+
+    def check(self, index: int, value: int) -> Move:
+        """ What placing value in index would lead to, without playing it. The status is
+            that of the current position when value is already there or EMPTY, and is
+            only known ahead of the move for puzzles with one solution
+        """
+        conflicts = self.conflicts(index, value)
+        candidates = self.candidates(index)
+        if value == self.grid[index]:
+            status = self.status()
+        elif self.solution is not None:
+            # the other entries are unchanged, so this one decides whether a wrong count of 0 is reached
+            wrong = self.wrong - (self.grid[index] != EMPTY and self.grid[index] != self.solution[index])
+            if value != EMPTY and value != self.solution[index] or wrong:
+                status = "unsolvable"
+            else:
+                filled = self.filled + (self.grid[index] == EMPTY) - (value == EMPTY)
+                status = "solved" if filled == self.geometry.cells else "unique"
+        else:
+            status = None
+
+        return Move(index, value, conflicts, candidates, status)
+
+    def candidate_mask(self, index: int) -> int:
+        """ The digits index could hold without clashing with the other filled cells, as a mask """
+        self.validate(index, EMPTY)
+        g = self.geometry
+        masks = self.masks
+        row, col, box = g.units_of[index]
+        mask = masks[row] | masks[col] | masks[box]
+        value = self.grid[index]
+        if value != EMPTY:
+            # the cell's own digit only counts against it when it is there twice
+            stride = self.stride
+            if self.counts[row * stride + value] < 2 and self.counts[col * stride + value] < 2 and \
+                    self.counts[box * stride + value] < 2:
+                mask &= ~g.bit[value]
+
+        return g.all_digits & ~mask
+
+    def candidates(self, index: int) -> tuple:
+        return self.geometry.mask_digits[self.candidate_mask(index)]
+
+    def conflicts(self, index: int, value: int = None) -> tuple:
+        """ The other cells sharing a unit with index that hold value (by default the
+            digit in index). Only units whose count shows the digit scan their cells
+        """
+        self.validate(index, EMPTY if value is None else value)
+        g = self.geometry
+        value = self.grid[index] if value is None else value
+        if value == EMPTY:
+            return ()
+
+        # the digit is in the unit at least once more than index itself accounts for
+        own = 1 if self.grid[index] == value else 0
+        found = set()
+        for u in g.units_of[index]:
+            if self.counts[u * self.stride + value] > own:
+                found.update(i for i in g.units[u] if i != index and self.grid[i] == value)
+
+        return tuple(sorted(found))
+
+    @property
+    def conflicted(self) -> bool:
+        """ True if some digit is twice in a unit """
+        return self.clashes > 0
+
+    def cells_with(self, value: int) -> list:
+        """ The cells holding value """
+        g = self.geometry
+        stride = self.stride
+        # only the rows the digit is counted in are read
+        return [i for r in range(g.size) if self.counts[r * stride + value]
+                for i in g.rows[r] if self.grid[i] == value]
+
+    def status(self) -> str:
+        """ One of STATUSES for the current position """
+        if self.clashes:
+            return "unsolvable"
+
+        if self.solution is not None:
+            if self.wrong:
+                return "unsolvable"
+            return "solved" if self.filled == self.geometry.cells else "unique"
+
+        if self.known_status is None:
+            if self.filled == self.geometry.cells:
+                self.known_status = "solved"
+            else:
+                solutions = self.solutions(self.grid)
+                self.known_status = "unknown" if solutions is None else \
+                    ("unsolvable", "unique", "multiple")[len(solutions)]
+
+        return self.known_status
@@ -0,0 +1,553 @@
+from collections import deque
+from itertools import combinations
+from random import Random
+from time import perf_counter
+
+from .grid import EMPTY, check_grid, geometry_of
+from .solver import SearchSolver, SearchStats, Step, HEURISTICS
+
+# inference rules run between guesses, in the order they are tried. Naked singles
+# are always on: any cell left with one candidate is filled straight away
+TECHNIQUES = ("hidden_singles", "naked_pairs", "hidden_pairs", "pointing", "box_line")
+# costlier rules that a solver can opt into, and the difficulty rater uses
+ADVANCED_TECHNIQUES = ("x_wing", "xy_wing", "swordfish", "coloring")
+
+
+class Contradiction(Exception):
+    """ Raised when a deduction leaves a cell or a unit with no way to be completed """
+
+
+class CandidateGrid:
+    """ A grid plus a candidate mask per cell, one bit per digit of its Geometry. Every
+        change is recorded on a trail so that a search can undo back to any earlier mark()
+    """
+
+    def __init__(self, grid):
+        self.geometry = g = geometry_of(grid)
+        self.grid = check_grid(grid, g)
+        self.cands = [g.all_digits] * g.cells
+        self.trail = []
+        self.singles = []
+        self.listener = None
+        # hidden_singles only rescans units changed since its last pass: the cells
+        # on the trail from scanned on, plus the cells undo() has put back. None
+        # when every unit needs scanning
+        self.scanned = None
+        self.restored = set()
+
+        # the givens are added one at a time so that two equal givens in
+        # a unit are caught here, rather than by every later check()
+        self.clash = False
+        row_of, col_of, box_of = g.row_of, g.col_of, g.box_of
+        row_mask = [0] * g.size
+        col_mask = [0] * g.size
+        box_mask = [0] * g.size
+        for i, value in enumerate(self.grid):
+            if value != EMPTY:
+                bit = g.bit[value]
+                if (row_mask[row_of[i]] | col_mask[col_of[i]] | box_mask[box_of[i]]) & bit:
+                    self.clash = True
+                row_mask[row_of[i]] |= bit
+                col_mask[col_of[i]] |= bit
+                box_mask[box_of[i]] |= bit
+
+        for i, value in enumerate(self.grid):
+            if value != EMPTY:
+                self.cands[i] = g.bit[value]
+            else:
+                self.cands[i] = g.all_digits & ~(row_mask[row_of[i]] | col_mask[col_of[i]] | box_mask[box_of[i]])
+                if g.popcount[self.cands[i]] == 1:
+                    self.singles.append(i)
+
+    def check(self):
+        """ Raises Contradiction if the givens clash or an empty cell has no candidates left """
+        if self.clash or 0 in self.cands:
+            raise Contradiction()
+
+    def mark(self) -> int:
+        return len(self.trail)
+
+    def undo(self, mark: int):
+        """ Reverts every change made since mark """
+        grid, cands, trail, restored = self.grid, self.cands, self.trail, self.restored
+        while len(trail) > mark:
+            index, mask, value = trail.pop()
+            if value == EMPTY and grid[index] != EMPTY and self.listener is not None:
+                self.listener(Step("clear", index, EMPTY))
+            cands[index] = mask
+            grid[index] = value
+            restored.add(index)
+        self.singles = []
+        if self.scanned is not None and self.scanned > mark:
+            self.scanned = mark
+
+    def eliminate(self, index: int, mask: int) -> bool:
+        """ Removes the digits in mask from the candidates of index
+            :returns True if anything was removed
+        """
+        old = self.cands[index]
+        new = old & ~mask
+        if new == old:
+            return False
+        if not new:
+            raise Contradiction()
+
+        self.trail.append((index, old, self.grid[index]))
+        self.cands[index] = new
+        if self.geometry.popcount[new] == 1 and self.grid[index] == EMPTY:
+            self.singles.append(index)
+
+        return True
+
+    def assign(self, index: int, value: int, kind: str = "infer"):
+        """ Writes value into index and removes it from the candidates of every peer
+            :param kind the Step kind reported to the listener
+        """
+        grid, cands = self.grid, self.cands
+        bit = self.geometry.bit[value]
+        if not cands[index] & bit:
+            raise Contradiction()
+
+        self.trail.append((index, cands[index], grid[index]))
+        grid[index] = value
+        cands[index] = bit
+        if self.listener is not None:
+            self.listener(Step(kind, index, value))
+
+        for p in self.geometry.peers[index]:
+            if cands[p] & bit:
+                self.eliminate(p, bit)
+
+    def naked_singles(self) -> int:
+        """ Fills every cell that is down to one candidate, including the ones that creates """
+        grid, cands, singles = self.grid, self.cands, self.singles
+        mask_digits = self.geometry.mask_digits
+        changed = 0
+        while singles:
+            index = singles.pop()
+            if grid[index] == EMPTY:
+                self.assign(index, mask_digits[cands[index]][0])
+                changed += 1
+
+        return changed
+
+    def hidden_singles(self) -> int:
+        """ Fills cells holding the only place left for a digit in one of their units """
+        grid, cands, trail, g = self.grid, self.cands, self.trail, self.geometry
+        all_digits, units, units_of = g.all_digits, g.units, g.units_of
+
+        # a unit none of whose cells changed since the last pass has nothing to find
+        if self.scanned is None:
+            dirty = [True] * len(units)
+        else:
+            dirty = [False] * len(units)
+            for i in self.restored.union(entry[0] for entry in trail[self.scanned:]):
+                for u in units_of[i]:
+                    dirty[u] = True
+        self.scanned = seen = len(trail)
+        self.restored = set()
+
+        changed = 0
+        for u, unit in enumerate(units):
+            if not dirty[u]:
+                continue
+            once = more = 0
+            for i in unit:
+                m = cands[i]
+                more |= once & m
+                once |= m
+            if once != all_digits:
+                raise Contradiction()
+
+            singles = once & ~more
+            if not singles:
+                continue
+            for i in unit:
+                m = cands[i] & singles
+                if m and grid[i] == EMPTY:
+                    if g.popcount[m] > 1:
+                        raise Contradiction()
+                    self.assign(i, g.mask_digits[m][0])
+                    changed += 1
+
+            # the units this pass has still to reach may have changed too
+            for entry in trail[seen:]:
+                for v in units_of[entry[0]]:
+                    dirty[v] = True
+            seen = len(trail)
+
+        return changed
+
+    def naked_pairs(self) -> int:
+        """ Two cells of a unit with the same two candidates: no other cell of the unit can take them """
+        grid, cands, popcount = self.grid, self.cands, self.geometry.popcount
+        changed = 0
+        for unit in self.geometry.units:
+            seen = {}
+            for i in unit:
+                m = cands[i]
+                if grid[i] == EMPTY and popcount[m] == 2:
+                    if m in seen:
+                        for j in unit:
+                            if j != i and j != seen[m] and cands[j] & m:
+                                changed += self.eliminate(j, m)
+                    else:
+                        seen[m] = i
+
+        return changed
+
+    def hidden_pairs(self) -> int:
+        """ Two digits that fit only the same two cells of a unit: those cells can hold nothing else """
+        grid, cands, g = self.grid, self.cands, self.geometry
+        changed = 0
+        for unit in g.units:
+            pairs = self.place_counts(unit, 2)[2]
+            if not pairs:
+                continue
+
+            # for every digit with two places, which positions of the unit can take it
+            seen = {}
+            for d in g.mask_digits[pairs]:
+                bit = g.bit[d]
+                places = 0
+                for pos, i in enumerate(unit):
+                    if cands[i] & bit and grid[i] == EMPTY:
+                        places |= 1 << pos
+                if places in seen:
+                    pair = bit | g.bit[seen[places]]
+                    for pos, i in enumerate(unit):
+                        if places >> pos & 1:
+                            changed += self.eliminate(i, g.all_digits & ~pair)
+                else:
+                    seen[places] = d
+
+        return changed
+
+    def place_counts(self, unit, limit: int) -> list:
+        """ Sorts the digits by how many empty cells of unit can take them, counting every
+            digit at once in three bit-sliced counter planes rather than one digit at a time.
+            :param limit at most 7
+            :returns masks, masks[k] holding the digits with exactly k places, for k up to limit
+        """
+        grid, cands = self.grid, self.cands
+        ones = twos = fours = over = 0
+        for i in unit:
+            if grid[i] == EMPTY:
+                m = cands[i]
+                carry = ones & m
+                ones ^= m
+                carry, twos = twos & carry, twos ^ carry
+                over |= fours & carry
+                fours ^= carry
+
+        valid = self.geometry.all_digits & ~over
+        return [valid & (ones if k & 1 else ~ones) & (twos if k & 2 else ~twos) & (fours if k & 4 else ~fours)
+                for k in range(limit + 1)]
+
+    def pointing(self) -> int:
+        """ A digit confined to one row or column within a box is removed from the rest of that line """
+        g = self.geometry
+        changed = 0
+        for box in g.boxes:
+            for holders, bit in self.holders(box):
+                rows = {g.row_of[i] for i in holders}
+                if len(rows) == 1:
+                    changed += self.remove_outside(g.rows[rows.pop()], box, bit)
+                cols = {g.col_of[i] for i in holders}
+                if len(cols) == 1:
+                    changed += self.remove_outside(g.cols[cols.pop()], box, bit)
+
+        return changed
+
+    def box_line(self) -> int:
+        """ A digit confined to one box within a row or column is removed from the rest of that box """
+        g = self.geometry
+        changed = 0
+        for line in g.lines:
+            for holders, bit in self.holders(line):
+                boxes = {g.box_of[i] for i in holders}
+                if len(boxes) == 1:
+                    changed += self.remove_outside(g.boxes[boxes.pop()], line, bit)
+
+        return changed
+
+    def holders(self, unit):
+        """ Yields (cells, bit) for each digit still open in unit that fits at most a box width of its cells """
+        grid, cands, g = self.grid, self.cands, self.geometry
+        few = 0
+        for m in self.place_counts(unit, g.box)[1:]:
+            few |= m
+
+        for d in g.mask_digits[few]:
+            bit = g.bit[d]
+            yield [i for i in unit if cands[i] & bit and grid[i] == EMPTY], bit
+
+    def remove_outside(self, unit, keep, bit: int) -> int:
+        """ Eliminates bit from the empty cells of unit that are not in keep """
+        grid, cands = self.grid, self.cands
+        changed = 0
+        for j in unit:
+            if cands[j] & bit and grid[j] == EMPTY and j not in keep:
+                changed += self.eliminate(j, bit)
+
+        return changed
+
+    def x_wing(self) -> int:
+        return self.fish(2)
+
+    def swordfish(self) -> int:
+        return self.fish(3)
+
+    def fish(self, size: int) -> int:
+        """ If a digit's places in size rows all fall in the same size columns, the digit
+            can only go in those columns via those rows, so it is removed from the rest
+            of the columns. Likewise with rows and columns swapped
+        """
+        grid, cands, g = self.grid, self.cands, self.geometry
+        changed = 0
+        for bases, covers in ((g.rows, g.cols), (g.cols, g.rows)):
+            for d in g.digits:
+                bit = g.bit[d]
+                # for each base line, the positions along it that can take the digit
+                places = []
+                for b, line in enumerate(bases):
+                    mask = 0
+                    for pos, i in enumerate(line):
+                        if grid[i] == EMPTY and cands[i] & bit:
+                            mask |= 1 << pos
+                    if 2 <= mask.bit_count() <= size:
+                        places.append((b, mask))
+
+                for group in combinations(places, size):
+                    union = 0
+                    for _, mask in group:
+                        union |= mask
+                    if union.bit_count() != size:
+                        continue
+                    used = {b for b, _ in group}
+                    for pos in range(g.size):
+                        if union >> pos & 1:
+                            for b, i in enumerate(covers[pos]):
+                                if b not in used and grid[i] == EMPTY and cands[i] & bit:
+                                    changed += self.eliminate(i, bit)
+
+        return changed
+
+    def xy_wing(self) -> int:
+        """ A pivot cell {a, b} seeing pincers {a, c} and {b, c}: one pincer must be c,
+            so c is removed from every cell seeing both pincers
+        """
+        grid, cands, g = self.grid, self.cands, self.geometry
+        popcount, peer_sets = g.popcount, g.peer_sets
+        changed = 0
+        pairs = [i for i in range(g.cells) if grid[i] == EMPTY and popcount[cands[i]] == 2]
+        for pivot in pairs:
+            wings = [p for p in g.peers[pivot]
+                     if grid[p] == EMPTY and popcount[cands[p]] == 2 and popcount[cands[p] & cands[pivot]] == 1]
+            for x, y in combinations(wings, 2):
+                c = cands[x] & cands[y]
+                if popcount[c] != 1 or c & cands[pivot] or cands[x] == cands[y]:
+                    continue
+                for i in peer_sets[x] & peer_sets[y]:
+                    if i != pivot and grid[i] == EMPTY and cands[i] & c:
+                        changed += self.eliminate(i, c)
+
+        return changed
+
+    def coloring(self) -> int:
+        """ Simple colouring. Cells linked by being a digit's only two places in some unit
+            alternate between true and false, so they are split into two colours. If two
+            cells of one colour share a unit that colour is false; a cell seeing both
+            colours cannot hold the digit
+        """
+        grid, cands, g = self.grid, self.cands, self.geometry
+        peer_sets = g.peer_sets
+        changed = 0
+        for d in g.digits:
+            bit = g.bit[d]
+            links = {}
+            for unit in g.units:
+                holders = [i for i in unit if grid[i] == EMPTY and cands[i] & bit]
+                if len(holders) == 2:
+                    a, b = holders
+                    links.setdefault(a, []).append(b)
+                    links.setdefault(b, []).append(a)
+
+            colour = {}
+            for start in links:
+                if start in colour:
+                    continue
+                colour[start] = 0
+                chain = [start]
+                queue = deque([start])
+                while queue:
+                    i = queue.popleft()
+                    for j in links[i]:
+                        if j not in colour:
+                            colour[j] = 1 - colour[i]
+                            chain.append(j)
+                            queue.append(j)
+                if len(chain) < 3:
+                    continue
+
+                sides = ([i for i in chain if colour[i] == 0], [i for i in chain if colour[i] == 1])
+                for side in sides:
+                    if any(j in peer_sets[i] for i, j in combinations(side, 2)):
+                        for i in side:
+                            if cands[i] & bit:
+                                changed += self.eliminate(i, bit)
+                        break
+                else:
+                    members = set(chain)
+                    seen_by = [set().union(*(peer_sets[i] for i in side)) for side in sides]
+                    for i in seen_by[0] & seen_by[1]:
+                        if i not in members and grid[i] == EMPTY and cands[i] & bit:
+                            changed += self.eliminate(i, bit)
+
+                if changed:
+                    return changed
+
+        return changed
+
+    def propagate(self, techniques=TECHNIQUES):
+        """ Applies naked singles and then each technique in turn, starting over from the
+            cheapest whenever one makes progress, until none of them changes anything
+        """
+        rules = [getattr(self, name) for name in techniques]
+        while True:
+            self.naked_singles()
+            for rule in rules:
+                if rule():
+                    break
+            else:
+                if not self.singles:
+                    return
+
+
+class PropagatingSolver(SearchSolver):
+    """ Backtracking search that runs constraint propagation to a fixpoint after
+        every guess, undoing through the CandidateGrid trail when a guess fails
+    """
+
+    def __init__(self, grid, random_select: bool = False, rng: Random = None, heuristic: str = "mrv",
+                 techniques=TECHNIQUES, stats: SearchStats = None, interrupt=None):
+        """ :param grid 81 ints (or the cells of another Geometry), EMPTY for unknown cells.
+                The solver works on a copy
+            :param random_select if true then values of each tile are tried in random order
+            :param rng the Random instance used by random_select
+            :param heuristic one of HEURISTICS
+            :param techniques the TECHNIQUES (or ADVANCED_TECHNIQUES) to propagate with, in order
+            :param stats optional SearchStats to record the search in
+            :param interrupt optional callable polled during the search, returning True stops it with Interrupted
+        """
+        if heuristic not in HEURISTICS:
+            raise ValueError("Unknown heuristic %r" % heuristic)
+        for name in techniques:
+            if name not in TECHNIQUES + ADVANCED_TECHNIQUES:
+                raise ValueError("Unknown technique %r" % name)
+
+        super().__init__(random_select, rng, stats, interrupt)
+        self.board = CandidateGrid(grid)
+        self.geometry = self.board.geometry
+        self.grid = self.board.grid
+        self.heuristic = heuristic
+        self.techniques = tuple(techniques)
+        self.guesses = 0
+        self.install_stats()
+        self.install_interrupt()
+
+    def install_stats(self):
+        super().install_stats()
+        stats = self.stats
+        if stats is None:
+            return
+
+        propagate = self.board.propagate
+
+        def timed_propagate(*args):
+            stats.propagations += 1
+            start = perf_counter()
+            try:
+                propagate(*args)
+            finally:
+                stats.add_phase("propagate", perf_counter() - start)
+
+        self.board.propagate = timed_propagate
+
+    def subscribe(self, listener):
+        super().subscribe(listener)
+        self.board.listener = lambda step: self.emit(*step)
+
+    def select(self) -> int:
+        """ Returns the empty cell to branch on next, -1 if the board is full """
+        grid, cands, g = self.grid, self.cands, self.geometry
+        if self.heuristic == "first":
+            for i in range(g.cells):
+                if grid[i] == EMPTY:
+                    return i
+            return -1
+
+        popcount = g.popcount
+        best, best_count, best_degree = -1, g.size + 1, -1
+        for i in range(g.cells):
+            if grid[i] == EMPTY:
+                count = popcount[cands[i]]
+                if count < best_count or count == best_count and self.heuristic == "mrv_degree":
+                    degree = sum(1 for p in g.peers[i] if grid[p] == EMPTY) if self.heuristic == "mrv_degree" else 0
+                    if count < best_count or degree > best_degree:
+                        best, best_count, best_degree = i, count, degree
+                        if count == 2 and self.heuristic == "mrv":
+                            break
+
+        return best
+
+    @property
+    def cands(self) -> list:
+        return self.board.cands
+
+    def search(self) -> bool:
+        """ Branches on one cell, propagating after each guess.
+            :returns True once enough solutions were found to stop searching
+        """
+        self.nodes += 1
+
+        index = self.select()
+        if index == -1:
+            return self.found()
+
+        domain = self.geometry.mask_digits[self.cands[index]]
+        if self.random_select:
+            domain = list(domain)
+            self.rng.shuffle(domain)
+
+        board = self.board
+        for value in domain:
+            mark = board.mark()
+            self.guesses += 1
+            try:
+                board.assign(index, value, kind="guess")
+                board.propagate(self.techniques)
+            except Contradiction:
+                board.undo(mark)
+                continue
+
+            if self.search():
+                return True
+            board.undo(mark)
+
+        return False
+
+    def run(self) -> bool:
+        board = self.board
+        try:
+            board.check()
+            board.propagate(self.techniques)
+        except Contradiction:
+            board.undo(0)
+            return False
+
+        if self.search():
+            return True
+
+        board.undo(0)
+        return False
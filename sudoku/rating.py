@@ -0,0 +1,96 @@
+from collections import namedtuple
+from random import Random
+
+from .grid import EMPTY
+from .propagation import CandidateGrid, Contradiction
+from .generator import generate
+
+# the techniques a human solver would reach for, easiest first, with the
+# difficulty each one stands for
+LEVELS = (
+    ("naked_singles", 1.0),
+    ("hidden_singles", 1.5),
+    ("pointing", 2.6),
+    ("box_line", 2.8),
+    ("naked_pairs", 3.0),
+    ("hidden_pairs", 3.4),
+    ("x_wing", 3.8),
+    ("xy_wing", 4.2),
+    ("swordfish", 4.6),
+    ("coloring", 5.5),
+)
+# the score of a puzzle that none of the techniques can finish
+GUESS_LEVEL = 10.0
+
+# named score ranges, inclusive
+BANDS = {
+    "easy": (1.0, 1.5),
+    "medium": (2.6, 3.4),
+    "hard": (3.8, 4.6),
+    "expert": (5.5, 5.5),
+    "diabolical": (GUESS_LEVEL, GUESS_LEVEL),
+}
+
+# score: the level of the hardest technique needed (GUESS_LEVEL if the techniques ran out)
+# hardest: that technique's name, "guess" if the techniques ran out
+# steps: how many times a technique was applied
+# counts: steps per technique name
+# solved: False if the techniques ran out or the puzzle has no solution
+Rating = namedtuple("Rating", ["score", "hardest", "steps", "counts", "solved"])
+
+
+def rate(grid) -> Rating:
+    """ Solves grid the way a person would: each step uses the easiest technique that
+        makes progress, and the rating is the hardest one that had to be used
+    """
+    board = CandidateGrid(grid)
+    rules = [(name, level, getattr(board, name)) for name, level in LEVELS]
+    score, hardest = 0.0, None
+    counts = {}
+
+    try:
+        board.check()
+        while EMPTY in board.grid:
+            for name, level, rule in rules:
+                if rule():
+                    counts[name] = counts.get(name, 0) + 1
+                    if level > score:
+                        score, hardest = level, name
+                    break
+            else:
+                return Rating(GUESS_LEVEL, "guess", sum(counts.values()), counts, False)
+    except Contradiction:
+        return Rating(GUESS_LEVEL, "guess", sum(counts.values()), counts, False)
+
+    return Rating(score, hardest, sum(counts.values()), counts, True)
+
+
+def band_of(score: float) -> str:
+    """ The name of the BANDS entry score falls in, None if it falls between them """
+    for name, (low, high) in BANDS.items():
+        if low <= score <= high:
+            return name
+
+    return None
+
+
+def generate_rated(band, rng: Random = None, symmetry: str = "none", attempts: int = 50) -> list:
+    """ Creates a unique puzzle whose rating falls inside band.
+        Cells are removed for as long as the puzzle stays unique and no harder than the
+        top of the band, rating it after every removal; a new grid is tried if the
+        finished puzzle is still easier than the bottom of the band.
+        :param band a name from BANDS or a (low, high) pair of scores
+        :param attempts how many grids to try before giving up with a ValueError
+    """
+    low, high = BANDS[band] if isinstance(band, str) else band
+    rng = rng if rng is not None else Random()
+
+    def accept(grid) -> bool:
+        return rate(grid).score <= high
+
+    for _ in range(attempts):
+        puzzle = generate(0, rng=rng, symmetry=symmetry, accept=accept)
+        if rate(puzzle).score >= low:
+            return puzzle
+
+    raise ValueError("No puzzle rated between %s and %s after %d attempts" % (low, high, attempts))
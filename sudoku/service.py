@@ -0,0 +1,332 @@
+""" An asyncio solving service. Clients connect over a Unix socket or TCP and send
+    newline-delimited JSON requests; every reply is one JSON line too.
+
+    {"op": "solve", "puzzle": "53..7....", "solver": "propagate", "timeout": 5}
+    {"op": "generate", "clues": 30, "symmetry": "none", "seed": 7, "box": 3}
+    {"op": "cancel", "job": 3}
+    {"op": "status"}
+    {"op": "open", "puzzle": "53..7...."}
+    {"op": "move", "session": 1, "cell": 2, "value": 4}
+    {"op": "check", "session": 1, "cell": 2, "value": 4}
+    {"op": "close", "session": 1}
+
+    A solve or generate request is answered at once with {"job": N, "status": "queued"},
+    or {"status": "rejected"} when the queue is full, and later with the job's result,
+    whose status is "ok", "cancelled", "timeout" or "error". An "id" given in a request
+    is copied into every reply to it. Jobs run on a pool of processes and stop part way
+    through their search when cancelled or out of time. A client disconnecting cancels
+    its jobs.
+
+    open starts a play session on a PlayBoard and answers with its number and the
+    position's status (see sudoku.play.STATUSES). move plays a value (0 clears the cell)
+    and check asks about one without playing it, both answering with the cells it
+    conflicts with, the cell's candidates and the position's status (null from check on a
+    puzzle without exactly one solution, where it needs the move played). Moves are checked
+    in the service itself rather than queued, as they take microseconds once the session
+    is open. The searches for solutions that opening a session, and moving on a puzzle
+    without exactly one solution, need are cut short after SESSION_SEARCH_TIME, with the
+    status "unknown", so they can't hold up other clients. Sessions belong to their
+    connection and close with it
+"""
+import asyncio
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from random import Random
+from time import monotonic
+
+from .grid import BOX, BOX_SIZES, parse, format_grid
+from .solver import Interrupted
+from .engine import SOLVERS, solve
+from .generator import SYMMETRIES, generate
+from .play import PlayBoard
+
+# the seconds a play session may search for solutions in the event loop, per request
+SESSION_SEARCH_TIME = 0.05
+
+# one flag per worker slot, set to stop the job running in that slot. Shared with
+# the worker processes by init_worker
+cancel_flags = None
+
+
+def init_worker(flags):
+    global cancel_flags
+    cancel_flags = flags
+
+
+def run_job(slot: int, op: str, params: dict, deadline: float) -> dict:
+    """ Worker side of a job, polling its slot's cancel flag and the deadline as it searches
+        :returns the fields of the reply
+    """
+    def interrupt() -> bool:
+        return cancel_flags[slot] or monotonic() > deadline
+
+    try:
+        if op == "solve":
+            solution = solve(params["grid"], solver=params["solver"], interrupt=interrupt)
+            return {"status": "ok", "solution": format_grid(solution) if solution is not None else None}
+
+        rng = Random(params["seed"]) if params["seed"] is not None else None
+        puzzle = generate(params["clues"], rng=rng, symmetry=params["symmetry"], interrupt=interrupt,
+                          box=params["box"])
+        return {"status": "ok", "puzzle": format_grid(puzzle)}
+    except Interrupted:
+        return {"status": "cancelled" if cancel_flags[slot] else "timeout"}
+    except ValueError as e:
+        return {"status": "error", "error": str(e)}
+
+
+def job_params(request: dict) -> tuple:
+    """ Checks a solve or generate request.
+        :returns (op, params, timeout or None)
+    """
+    op = request.get("op")
+    timeout = request.get("timeout")
+    if timeout is not None and (not isinstance(timeout, (int, float)) or timeout <= 0):
+        raise ValueError("timeout must be a positive number of seconds")
+
+    if op == "solve":
+        solver = request.get("solver", "propagate")
+        if solver not in SOLVERS:
+            raise ValueError("Unknown solver %r" % solver)
+        return op, {"grid": parse(str(request.get("puzzle", ""))), "solver": solver}, timeout
+
+    clues = request.get("clues", 30)
+    if not isinstance(clues, int) or clues < 0:
+        raise ValueError("clues must be a number of cells")
+    symmetry = request.get("symmetry", "none")
+    if symmetry not in SYMMETRIES:
+        raise ValueError("Unknown symmetry %r" % symmetry)
+    seed = request.get("seed")
+    if seed is not None and not isinstance(seed, int):
+        raise ValueError("seed must be an integer")
+    box = request.get("box", BOX)
+    if box not in BOX_SIZES:
+        raise ValueError("Unsupported box size %r" % box)
+    return op, {"clues": clues, "symmetry": symmetry, "seed": seed, "box": box}, timeout
+
+
+class Job:
+    def __init__(self, number: int, op: str, params: dict, timeout: float):
+        self.number = number
+        self.op = op
+        self.params = params
+        self.timeout = timeout
+        # "queued", "running" or "done"
+        self.state = "queued"
+        self.slot = None
+        self.result = asyncio.get_running_loop().create_future()
+
+
+class SolveService:
+    """ A bounded queue of jobs drained by one task per worker process. Each task owns
+        a slot in the shared cancel flags, so cancelling a running job is a single write
+        that the worker notices within INTERRUPT_EVERY search nodes
+    """
+
+    def __init__(self, workers: int = None, queue_size: int = 64, timeout: float = 30.0):
+        """ :param workers the number of worker processes, all cores when None
+            :param queue_size how many jobs can wait for a worker before new ones are rejected
+            :param timeout the seconds a job may run for when its request gives none
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.flags = multiprocessing.RawArray("b", self.workers)
+        self.jobs = {}
+        # jobs waiting for a worker. Cancelled ones stay on self.queue until a worker
+        # skips them, so this is what the queue size is held to
+        self.waiting = 0
+        self.next_number = 1
+        self.counts = {"completed": 0, "cancelled": 0, "timeout": 0, "error": 0, "rejected": 0}
+        self.next_session = 1
+        self.sessions = 0
+        self.moves = 0
+        self.queue = None
+        self.pool = None
+        self.tasks = []
+
+    async def start(self):
+        self.queue = asyncio.Queue()
+        self.pool = ProcessPoolExecutor(self.workers, initializer=init_worker, initargs=(self.flags,))
+        self.tasks = [asyncio.create_task(self.work(slot)) for slot in range(self.workers)]
+
+    async def stop(self):
+        """ Cancels every job and shuts the workers down """
+        for number in list(self.jobs):
+            self.cancel(number)
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.pool.shutdown(cancel_futures=True)
+
+    def submit(self, op: str, params: dict, timeout: float = None) -> Job:
+        """ Queues a job, or returns None when the queue is full """
+        if self.waiting >= self.queue_size:
+            self.counts["rejected"] += 1
+            return None
+
+        job = Job(self.next_number, op, params, timeout if timeout is not None else self.timeout)
+        self.next_number += 1
+        self.jobs[job.number] = job
+        self.waiting += 1
+        self.queue.put_nowait(job)
+        return job
+
+    def cancel(self, number: int) -> bool:
+        """ Stops a queued or running job. Returns False if there is no such job left """
+        job = self.jobs.get(number)
+        if job is None:
+            return False
+
+        if job.state == "running":
+            self.flags[job.slot] = 1
+        else:
+            # the worker task skips it when it comes off the queue
+            self.finish(job, {"status": "cancelled"})
+        return True
+
+    def finish(self, job: Job, reply: dict):
+        if job.state == "queued":
+            self.waiting -= 1
+        job.state = "done"
+        del self.jobs[job.number]
+        status = reply["status"]
+        self.counts["completed" if status == "ok" else status] += 1
+        job.result.set_result(reply)
+
+    async def work(self, slot: int):
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self.queue.get()
+            if job.state == "done":
+                continue
+
+            self.waiting -= 1
+            job.state = "running"
+            job.slot = slot
+            self.flags[slot] = 0
+            try:
+                reply = await loop.run_in_executor(self.pool, run_job, slot, job.op, job.params,
+                                                   monotonic() + job.timeout)
+            except asyncio.CancelledError:
+                self.flags[slot] = 1
+                raise
+            except Exception as e:
+                reply = {"status": "error", "error": "worker failed: %s" % e}
+            self.finish(job, reply)
+
+    def status(self) -> dict:
+        return dict(status="ok", queued=self.waiting, running=len(self.jobs) - self.waiting, workers=self.workers,
+                    queue_size=self.queue_size, sessions=self.sessions, moves=self.moves, **self.counts)
+
+    def open_session(self, request: dict, sessions: dict) -> dict:
+        board = PlayBoard(parse(str(request.get("puzzle", ""))), search_time=SESSION_SEARCH_TIME)
+        number = self.next_session
+        self.next_session += 1
+        self.sessions += 1
+        sessions[number] = board
+        return {"status": "ok", "session": number, "position": board.status()}
+
+    def play(self, request: dict, sessions: dict) -> dict:
+        """ Answers a move or check request on one of the connection's sessions """
+        board = sessions.get(request.get("session"))
+        if board is None:
+            raise ValueError("no such session")
+        cell = request.get("cell")
+        value = request.get("value")
+        if not isinstance(cell, int) or not isinstance(value, int):
+            raise ValueError("cell and value must be integers")
+
+        if request["op"] == "move":
+            move = board.place(cell, value)
+            self.moves += 1
+        else:
+            move = board.check(cell, value)
+        return {"status": "ok", "session": request["session"], "cell": cell, "value": value,
+                "conflicts": list(move.conflicts), "candidates": list(move.candidates), "position": move.status}
+
+    async def handle(self, reader, writer):
+        """ Serves one client connection """
+        lock = asyncio.Lock()
+        own = {}
+        sessions = {}
+
+        async def reply(request: dict, message: dict):
+            if isinstance(request, dict) and "id" in request:
+                message = dict(message, id=request["id"])
+            async with lock:
+                writer.write((json.dumps(message) + "\n").encode())
+                await writer.drain()
+
+        async def deliver(request: dict, job: Job):
+            message = await job.result
+            own.pop(job.number, None)
+            await reply(request, dict(message, job=job.number))
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+
+                request = None
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("a request must be a JSON object")
+                    op = request.get("op")
+                    if op in ("solve", "generate"):
+                        job = self.submit(*job_params(request))
+                        if job is None:
+                            await reply(request, {"status": "rejected", "error": "queue full",
+                                                  "queued": self.waiting})
+                            continue
+                        own[job.number] = asyncio.create_task(deliver(request, job))
+                        await reply(request, {"status": "queued", "job": job.number, "queued": self.waiting})
+                    elif op == "cancel":
+                        if self.cancel(request.get("job")):
+                            await reply(request, {"status": "ok", "job": request["job"]})
+                        else:
+                            await reply(request, {"status": "error", "error": "no such job"})
+                    elif op == "status":
+                        await reply(request, self.status())
+                    elif op == "open":
+                        await reply(request, self.open_session(request, sessions))
+                    elif op in ("move", "check"):
+                        await reply(request, self.play(request, sessions))
+                    elif op == "close":
+                        if sessions.pop(request.get("session"), None) is None:
+                            await reply(request, {"status": "error", "error": "no such session"})
+                        else:
+                            self.sessions -= 1
+                            await reply(request, {"status": "ok", "session": request["session"]})
+                    else:
+                        raise ValueError("Unknown op %r" % op)
+                except (ValueError, TypeError) as e:
+                    await reply(request, {"status": "error", "error": str(e)})
+        except ConnectionError:
+            pass
+        finally:
+            for number, task in list(own.items()):
+                self.cancel(number)
+                task.cancel()
+            self.sessions -= len(sessions)
+            writer.close()
+
+
+async def serve(service: SolveService, path: str = None, host: str = "127.0.0.1", port: int = 8765):
+    """ Runs service on a Unix socket at path, or on TCP host:port when path is None, until cancelled """
+    await service.start()
+    try:
+        if path is not None:
+            server = await asyncio.start_unix_server(service.handle, path)
+        else:
+            server = await asyncio.start_server(service.handle, host, port)
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
@@ -0,0 +1,460 @@
+import sys
+from collections import namedtuple
+from random import Random
+from time import perf_counter
+
+from .grid import EMPTY, check_grid, geometry_of, is_consistent
+
+# how a solver works out which values a cell can take
+#   "sets": build sets of the values in the cell's row, column and box each time
+#   "bitmask": keep per row, column and box occupancy masks updated on every placement
+CANDIDATE_MODES = ("sets", "bitmask")
+
+# An event emitted by a solver while it searches.
+#   kind "row", "column", "box": the cell's domain after removing that unit's values
+#   kind "guess": value was written into the cell
+#   kind "infer": value was written into the cell by constraint propagation
+#   kind "clear": the cell was reset to empty while backtracking
+Step = namedtuple("Step", ["kind", "index", "value"])
+
+# how a solver picks the next empty cell to branch on
+#   "first": the first empty cell in row-major order
+#   "mrv": the cell with the fewest remaining values
+#   "mrv_degree": mrv, breaking ties by the most empty peers
+HEURISTICS = ("first", "mrv", "mrv_degree")
+
+# how many search nodes a solver visits between calls to its interrupt check
+INTERRUPT_EVERY = 64
+# the search recurses once per cell it fills, through up to this many frames
+# (the search itself, the stats and the interrupt wrappers, and some slack)
+FRAMES_PER_CELL = 4
+
+
+class Interrupted(Exception):
+    """ Raised out of solve() and count_solutions() when the solver's interrupt check
+        asks it to stop. The solver's grid is left part way through the search
+    """
+
+
+class CellQueue:
+    """ Buckets the empty cells of a solver by how many values they can still take,
+        so the most constrained cell is found without scanning the whole board.
+        Sits between the search and the solver's place/unplace to keep the
+        buckets (and the empty peer counts used for tie-breaking) up to date
+    """
+
+    def __init__(self, solver, place, unplace, degree: bool = False):
+        """ :param place, unplace the solver's own place/unplace, called after/before the queue updates
+            :param degree if true then ties are broken by the number of empty peers
+        """
+        self.grid = solver.grid
+        self.domain = solver.domain
+        self.peers = solver.geometry.peers
+        self.base_place = place
+        self.base_unplace = unplace
+        self.degree = degree
+
+        cells = solver.geometry.cells
+        self.buckets = [set() for _ in range(solver.geometry.size + 1)]
+        self.count = [0] * cells
+        self.empty_peers = [0] * cells
+        for i in range(cells):
+            if self.grid[i] == EMPTY:
+                self.count[i] = len(self.domain(i))
+                self.buckets[self.count[i]].add(i)
+                self.empty_peers[i] = sum(1 for p in self.peers[i] if self.grid[p] == EMPTY)
+
+    def select(self, start: int = 0) -> int:
+        """ Returns the empty cell with the fewest values left, -1 if the board is full """
+        for bucket in self.buckets:
+            if bucket:
+                if self.degree and len(bucket) > 1:
+                    return max(bucket, key=self.empty_peers.__getitem__)
+                return next(iter(bucket))
+
+        return -1
+
+    def place(self, index: int, value: int):
+        grid, domain, count, buckets, empty_peers = self.grid, self.domain, self.count, self.buckets, self.empty_peers
+
+        buckets[count[index]].discard(index)
+        for p in self.peers[index]:
+            if grid[p] == EMPTY:
+                empty_peers[p] -= 1
+                if value in domain(p):
+                    buckets[count[p]].discard(p)
+                    count[p] -= 1
+                    buckets[count[p]].add(p)
+
+        self.base_place(index, value)
+
+    def unplace(self, index: int, value: int):
+        grid, domain, count, buckets, empty_peers = self.grid, self.domain, self.count, self.buckets, self.empty_peers
+
+        self.base_unplace(index, value)
+
+        for p in self.peers[index]:
+            if grid[p] == EMPTY:
+                empty_peers[p] += 1
+                if value in domain(p):
+                    buckets[count[p]].discard(p)
+                    count[p] += 1
+                    buckets[count[p]].add(p)
+        count[index] = len(domain(index))
+        buckets[count[index]].add(index)
+
+
+class SearchStats:
+    """ Counters filled in by a solver created with stats=SearchStats(). A solver
+        without one does none of this bookkeeping. One instance can be passed to
+        several solvers to total them up
+    """
+
+    def __init__(self):
+        self.nodes = 0
+        self.backtracks = 0
+        self.max_depth = 0
+        self.solutions = 0
+        self.propagations = 0
+        # seconds spent per phase: "setup" building the solver, "search" in solve or
+        # count_solutions, and "propagate" the part of the search spent propagating
+        self.phases = {}
+
+    def add_phase(self, phase: str, seconds: float):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def as_dict(self) -> dict:
+        return {
+            "nodes": self.nodes,
+            "backtracks": self.backtracks,
+            "max_depth": self.max_depth,
+            "solutions": self.solutions,
+            "propagations": self.propagations,
+            "phases": dict(self.phases),
+        }
+
+    def __repr__(self):
+        return "SearchStats(%s)" % ", ".join("%s=%r" % item for item in self.as_dict().items())
+
+
+class SearchSolver:
+    """ The parts every solver shares: step listeners, statistics, solution counting
+        and the solve/count_solutions entry points. Subclasses implement run(), and
+        call install_stats() once they are built
+    """
+
+    def __init__(self, random_select: bool = False, rng: Random = None, stats: SearchStats = None,
+                 interrupt=None):
+        if rng is None and random_select:
+            rng = Random()
+        self.random_select = random_select
+        self.rng = rng
+        self.listeners = []
+        self.stats = stats
+        self.created = perf_counter() if stats is not None else None
+        self.interrupt = interrupt
+
+        self.limit = 1
+        self.solutions = 0
+        self.nodes = 0
+        # copies of the solutions found, while all_solutions is running
+        self.collected = None
+
+    def subscribe(self, listener):
+        """ Registers a callable that is passed every Step the search makes """
+        self.listeners.append(listener)
+
+    def emit(self, kind: str, index: int, value):
+        step = Step(kind, index, value)
+        for listener in self.listeners:
+            listener(step)
+
+    def install_stats(self):
+        """ Records the setup time and wraps self.search to keep self.stats up to date.
+            Does nothing for a solver without stats, so its search runs untouched
+        """
+        stats = self.stats
+        if stats is None:
+            return
+
+        stats.add_phase("setup", perf_counter() - self.created)
+        search = self.search
+        depth = 0
+
+        def traced_search(*args):
+            nonlocal depth
+            stats.nodes += 1
+            depth += 1
+            if depth > stats.max_depth:
+                stats.max_depth = depth
+            solutions = self.solutions
+            try:
+                stop = search(*args)
+            finally:
+                depth -= 1
+            # a subtree that ran out of values without finding anything
+            if not stop and self.solutions == solutions:
+                stats.backtracks += 1
+            return stop
+
+        self.search = traced_search
+
+    def install_interrupt(self):
+        """ Wraps self.search to call self.interrupt every INTERRUPT_EVERY nodes, raising
+            Interrupted once it returns true. Does nothing for a solver without one
+        """
+        interrupt = self.interrupt
+        if interrupt is None:
+            return
+
+        search = self.search
+        countdown = INTERRUPT_EVERY
+
+        def checked_search(*args):
+            nonlocal countdown
+            countdown -= 1
+            if not countdown:
+                countdown = INTERRUPT_EVERY
+                if interrupt():
+                    raise Interrupted()
+            return search(*args)
+
+        self.search = checked_search
+
+    def run(self) -> bool:
+        """ Searches until self.limit solutions were found.
+            :returns True if the limit was reached
+        """
+        raise NotImplementedError
+
+    def timed_run(self) -> bool:
+        """ run(), adding the time taken and solutions found to self.stats """
+        # big boards recurse deeper than Python allows by default
+        depth = FRAMES_PER_CELL * len(self.grid) + 100
+        if sys.getrecursionlimit() < depth:
+            sys.setrecursionlimit(depth)
+
+        if self.stats is None:
+            return self.run()
+
+        start = perf_counter()
+        try:
+            return self.run()
+        finally:
+            self.stats.add_phase("search", perf_counter() - start)
+            self.stats.solutions += self.solutions
+
+    def found(self) -> bool:
+        """ Called by the search whenever self.grid holds a solution.
+            :returns True if the search should stop
+        """
+        self.solutions += 1
+        if self.collected is not None:
+            self.collected.append(list(self.grid))
+
+        return self.solutions >= self.limit
+
+    def solve(self) -> bool:
+        """ Fills self.grid with the first solution found.
+            :returns False (leaving the grid unchanged) if there is none
+        """
+        self.limit = 1
+        self.solutions = 0
+        return self.timed_run()
+
+    def count_solutions(self, limit: int = 2) -> int:
+        """ Counts solutions, stopping as soon as limit is reached """
+        self.limit = limit
+        self.solutions = 0
+        self.timed_run()
+        return self.solutions
+
+    def all_solutions(self, limit: int) -> list:
+        """ Returns copies of up to limit solutions, in the order the search finds them """
+        self.collected = []
+        try:
+            self.count_solutions(limit)
+            return self.collected
+        finally:
+            self.collected = None
+
+
+class BacktrackSolver(SearchSolver):
+    """ Depth first search over a flat grid of any Geometry. Has no knowledge of how
+        (or if) the board is displayed; views subscribe to its step events
+    """
+
+    def __init__(self, grid, random_select: bool = False, rng: Random = None, candidates: str = "bitmask",
+                 heuristic: str = "mrv", stats: SearchStats = None, interrupt=None):
+        """ :param grid 81 ints (or the cells of another Geometry), EMPTY for unknown cells.
+                The solver works on a copy
+            :param random_select if true then values of each tile are tried in random order
+            :param rng the Random instance used by random_select
+            :param candidates one of CANDIDATE_MODES
+            :param heuristic one of HEURISTICS
+            :param stats optional SearchStats to record the search in
+            :param interrupt optional callable polled during the search, returning True stops it with Interrupted
+        """
+        if candidates not in CANDIDATE_MODES:
+            raise ValueError("Unknown candidate mode %r" % candidates)
+        if heuristic not in HEURISTICS:
+            raise ValueError("Unknown heuristic %r" % heuristic)
+
+        super().__init__(random_select, rng, stats, interrupt)
+        self.geometry = g = geometry_of(grid)
+        self.grid = check_grid(grid, g)
+        self.candidates = candidates
+        self.heuristic = heuristic
+
+        # givens that clash leave nothing to search for
+        self.consistent = True
+        if candidates == "bitmask":
+            # the geometry's tables, looked up at every search node
+            self.row_of, self.col_of, self.box_of = g.row_of, g.col_of, g.box_of
+            self.bit, self.all_digits, self.mask_digits = g.bit, g.all_digits, g.mask_digits
+            self.row_mask = [0] * g.size
+            self.col_mask = [0] * g.size
+            self.box_mask = [0] * g.size
+            for i, value in enumerate(self.grid):
+                if value != EMPTY:
+                    if (self.row_mask[g.row_of[i]] | self.col_mask[g.col_of[i]] |
+                            self.box_mask[g.box_of[i]]) & g.bit[value]:
+                        self.consistent = False
+                    self.row_mask[g.row_of[i]] |= g.bit[value]
+                    self.col_mask[g.col_of[i]] |= g.bit[value]
+                    self.box_mask[g.box_of[i]] |= g.bit[value]
+
+            self.domain = self.mask_domain
+            self.place = self.mask_place
+            self.unplace = self.mask_unplace
+        else:
+            self.consistent = is_consistent(self.grid)
+
+        if heuristic == "first":
+            self.select = self.next_empty
+        else:
+            queue = CellQueue(self, self.place, self.unplace, degree=heuristic == "mrv_degree")
+            self.select = queue.select
+            self.place = queue.place
+            self.unplace = queue.unplace
+
+        self.install_stats()
+        self.install_interrupt()
+
+    def row_values(self, index: int) -> set:
+        """ Returns the values in the row of index, ignoring the cell itself """
+        g = self.geometry
+        return {self.grid[i] for i in g.rows[g.row_of[index]] if i != index}
+
+    def col_values(self, index: int) -> set:
+        """ Returns the values in the column of index, ignoring the cell itself """
+        g = self.geometry
+        return {self.grid[i] for i in g.cols[g.col_of[index]] if i != index}
+
+    def box_values(self, index: int) -> set:
+        """ Returns the values in the box of index, ignoring the cell itself """
+        g = self.geometry
+        return {self.grid[i] for i in g.boxes[g.box_of[index]] if i != index}
+
+    def domain(self, index: int) -> set:
+        """ The values that can go in index while keeping the board valid """
+        return set(self.geometry.digits) - self.row_values(index) - self.col_values(index) - \
+            self.box_values(index)
+
+    def place(self, index: int, value: int):
+        """ Writes value into the empty cell index """
+        self.grid[index] = value
+
+    def unplace(self, index: int, value: int):
+        """ Reverts a place(index, value) """
+        self.grid[index] = EMPTY
+
+    def mask_domain(self, index: int) -> tuple:
+        """ domain for the "bitmask" mode, as a tuple of digits """
+        return self.mask_digits[self.all_digits & ~(self.row_mask[self.row_of[index]] |
+                                                    self.col_mask[self.col_of[index]] |
+                                                    self.box_mask[self.box_of[index]])]
+
+    def mask_place(self, index: int, value: int):
+        """ place for the "bitmask" mode """
+        bit = self.bit[value]
+        self.grid[index] = value
+        self.row_mask[self.row_of[index]] |= bit
+        self.col_mask[self.col_of[index]] |= bit
+        self.box_mask[self.box_of[index]] |= bit
+
+    def mask_unplace(self, index: int, value: int):
+        """ unplace for the "bitmask" mode """
+        bit = ~self.bit[value]
+        self.grid[index] = EMPTY
+        self.row_mask[self.row_of[index]] &= bit
+        self.col_mask[self.col_of[index]] &= bit
+        self.box_mask[self.box_of[index]] &= bit
+
+    def scanned_domain(self, index: int) -> set:
+        """ Same as domain, but reports the domain to listeners after each unit is removed """
+        domain = set(self.geometry.digits)
+        domain -= self.row_values(index)
+        self.emit("row", index, frozenset(domain))
+        domain -= self.col_values(index)
+        self.emit("column", index, frozenset(domain))
+        domain -= self.box_values(index)
+        self.emit("box", index, frozenset(domain))
+
+        return domain
+
+    def next_empty(self, start: int) -> int:
+        """ Retrieves the index of the next empty cell at or after start, -1 if there is none """
+        grid = self.grid
+        for i in range(start, self.geometry.cells):
+            if grid[i] == EMPTY:
+                return i
+
+        return -1
+
+    def search(self, start: int) -> bool:
+        """ Fills the empty cells from start onwards.
+            :returns True once enough solutions were found to stop searching
+        """
+        self.nodes += 1
+
+        # getting the next tile to work on if there exists one
+        index = self.select(start)
+        if index == -1:
+            return self.found()
+
+        if self.listeners:
+            domain = self.scanned_domain(index)
+        else:
+            domain = self.domain(index)
+
+        # if there are no possible values, then we should backtrack
+        if not domain:
+            return False
+
+        if self.random_select:
+            domain = list(domain)
+            self.rng.shuffle(domain)
+
+        for value in domain:
+            self.place(index, value)
+            if self.listeners:
+                self.emit("guess", index, value)
+
+            if self.search(index):
+                return True
+
+            self.unplace(index, value)
+
+        # if we tried all possible values for the tile but could not find
+        # a valid board, the tile is empty again so backtrack
+        if self.listeners:
+            self.emit("clear", index, EMPTY)
+
+        return False
+
+    def run(self) -> bool:
+        if not self.consistent:
+            return False
+
+        return self.search(0)
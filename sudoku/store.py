@@ -0,0 +1,277 @@
+import mmap
+import os
+import struct
+from hashlib import blake2b
+
+import numpy as np
+
+from .grid import CELLS, check_grid
+from .symmetry import canonical_form
+
+# puzzles are packed two cells to a byte, 4 bits per cell
+RECORD_SIZE = (CELLS + 1) // 2
+
+DATA_MAGIC = b"SDKP"
+INDEX_MAGIC = b"SDKI"
+VERSION = 1
+# magic, version, record count
+HEADER = struct.Struct("<4sIQ")
+# magic, version, slot count, used slots
+INDEX_HEADER = struct.Struct("<4sIQQ")
+
+INITIAL_SLOTS = 1 << 16
+INITIAL_RECORDS = 1 << 12
+# the index is doubled once more than this fraction of its slots are used
+MAX_LOAD = 0.5
+# slots of the old table rehashed at a time when the index grows
+REHASH_SLICE = 1 << 16
+
+
+def pack(grid) -> bytes:
+    """ 4 bits per cell, the first cell of each pair in the high nibble """
+    cells = list(grid) + [0] * (RECORD_SIZE * 2 - CELLS)
+    return bytes(cells[i] << 4 | cells[i + 1] for i in range(0, len(cells), 2))
+
+
+def unpack(record) -> list:
+    grid = []
+    for byte in record:
+        grid.append(byte >> 4)
+        grid.append(byte & 0xF)
+
+    return grid[:CELLS]
+
+
+def fingerprint(grid) -> int:
+    """ A non-zero 64 bit hash of grid's canonical form, the same for every symmetric variant of grid """
+    canonical, _ = canonical_form(grid)
+    value = int.from_bytes(blake2b(bytes(canonical), digest_size=8).digest(), "little")
+    return value or 1
+
+
+class PuzzleStore:
+    """ An append-only file of puzzles, 41 bytes each, memory-mapped so records are read
+        straight from the page cache. A second file, path + ".idx", is an open addressing
+        hash table from the 64 bit fingerprint of each puzzle's canonical form to its
+        record number, so a puzzle equal to a stored one up to symmetry is found with one
+        or two probes. Neither file is ever loaded into memory as a whole.
+
+        Fingerprints are not verified against the stored puzzle, as that would mean
+        canonicalizing it again; with 64 bits the chance of any false duplicate among
+        a hundred million puzzles is below 1 in 3000. An index that is missing or does
+        not account for every record is rebuilt from the records when the store is opened
+    """
+
+    def __init__(self, path: str):
+        """ Opens the store at path, creating it if it does not exist """
+        self.path = path
+        self.index_path = path + ".idx"
+
+        if not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.write(HEADER.pack(DATA_MAGIC, VERSION, 0))
+                f.truncate(HEADER.size + INITIAL_RECORDS * RECORD_SIZE)
+
+        self.data_file = open(path, "r+b")
+        self.data = mmap.mmap(self.data_file.fileno(), 0)
+        magic, version, self.count = HEADER.unpack_from(self.data)
+        if magic != DATA_MAGIC or version != VERSION:
+            raise ValueError("%s is not a puzzle store" % path)
+
+        self.table = None
+        if self.index_matches():
+            self.open_index()
+        else:
+            self.rebuild_index()
+
+    @staticmethod
+    def create_index(path: str, slots: int):
+        with open(path, "wb") as f:
+            f.write(INDEX_HEADER.pack(INDEX_MAGIC, VERSION, slots, 0))
+            f.truncate(INDEX_HEADER.size + slots * 16)
+
+    def index_matches(self) -> bool:
+        """ True if the index file exists, is whole and holds a fingerprint for every record """
+        try:
+            with open(self.index_path, "rb") as f:
+                magic, version, slots, used = INDEX_HEADER.unpack(f.read(INDEX_HEADER.size))
+        except (OSError, struct.error):
+            return False
+
+        return magic == INDEX_MAGIC and version == VERSION and used == self.count and \
+            slots >= INITIAL_SLOTS and slots & (slots - 1) == 0 and \
+            os.path.getsize(self.index_path) == INDEX_HEADER.size + slots * 16
+
+    def open_index(self):
+        # the header is mapped on its own so adds update it in place
+        self.index_file = open(self.index_path, "r+b")
+        self.index_header = mmap.mmap(self.index_file.fileno(), INDEX_HEADER.size)
+        magic, version, self.slots, self.used = INDEX_HEADER.unpack_from(self.index_header)
+        if magic != INDEX_MAGIC or version != VERSION:
+            self.close_index()
+            raise ValueError("%s is not a puzzle store index" % self.index_path)
+
+        # each slot is (fingerprint, record number + 1), all zero when free
+        self.table = np.memmap(self.index_path, dtype=np.uint64, mode="r+", offset=INDEX_HEADER.size,
+                               shape=(self.slots, 2))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, number: int) -> list:
+        if number < 0:
+            number += self.count
+        if not 0 <= number < self.count:
+            raise IndexError("puzzle number out of range")
+
+        start = HEADER.size + number * RECORD_SIZE
+        return unpack(self.data[start:start + RECORD_SIZE])
+
+    def __iter__(self):
+        for number in range(self.count):
+            yield self[number]
+
+    def __contains__(self, grid) -> bool:
+        return self.find(grid) != -1
+
+    def probe(self, key: int) -> tuple:
+        """ Linear probing for key.
+            :returns (slot, record number), the record number being -1 at the free slot where key would go
+        """
+        table = self.table
+        mask = self.slots - 1
+        slot = key & mask
+        while True:
+            stored = int(table[slot, 0])
+            if stored == 0:
+                return slot, -1
+            if stored == key:
+                return slot, int(table[slot, 1]) - 1
+            slot = (slot + 1) & mask
+
+    def find(self, grid) -> int:
+        """ The record number of a stored puzzle equal to grid up to symmetry, -1 if there is none """
+        return self.probe(fingerprint(check_grid(grid)))[1]
+
+    def add(self, grid) -> tuple:
+        """ Stores grid unless a symmetric variant of it is already stored.
+            :returns (record number, True if grid was added)
+        """
+        grid = check_grid(grid)
+        key = fingerprint(grid)
+        slot, number = self.probe(key)
+        if number != -1:
+            return number, False
+
+        number = self.count
+        end = HEADER.size + (number + 1) * RECORD_SIZE
+        if end > len(self.data):
+            self.grow_data(end)
+        self.data[end - RECORD_SIZE:end] = pack(grid)
+        self.count += 1
+        HEADER.pack_into(self.data, 0, DATA_MAGIC, VERSION, self.count)
+
+        self.table[slot] = (key, number + 1)
+        self.used += 1
+        self.write_index_header()
+        if self.used > self.slots * MAX_LOAD:
+            self.grow_index()
+
+        return number, True
+
+    def grow_data(self, needed: int):
+        size = max(needed, len(self.data) * 2)
+        self.data.close()
+        self.data_file.truncate(size)
+        self.data = mmap.mmap(self.data_file.fileno(), 0)
+
+    def write_index_header(self):
+        INDEX_HEADER.pack_into(self.index_header, 0, INDEX_MAGIC, VERSION, self.slots, self.used)
+
+    def close_index(self):
+        self.index_header.close()
+        self.index_file.close()
+        self.table = None
+
+    @staticmethod
+    def insert(table, entries, mask: int):
+        """ Linear probing for a whole array of (fingerprint, value) entries at once. Each
+            round, the first entry aiming at each free slot takes it and every other entry
+            moves on one slot
+        """
+        slots = entries[:, 0] & np.uint64(mask)
+        while len(entries):
+            free = np.flatnonzero(table[slots, 0] == 0)
+            _, first = np.unique(slots[free], return_index=True)
+            placed = free[first]
+            table[slots[placed]] = entries[placed]
+
+            waiting = np.ones(len(entries), dtype=bool)
+            waiting[placed] = False
+            entries = entries[waiting]
+            slots = (slots[waiting] + np.uint64(1)) & np.uint64(mask)
+
+    def write_index(self, slots: int, batches):
+        """ Builds an index of slots slots from batches, arrays of (fingerprint, record
+            number + 1) rows, and opens it in place of the current one
+        """
+        new_path = self.index_path + ".new"
+        self.create_index(new_path, slots)
+        table = np.memmap(new_path, dtype=np.uint64, mode="r+", offset=INDEX_HEADER.size, shape=(slots, 2))
+        for entries in batches:
+            self.insert(table, entries, slots - 1)
+        table.flush()
+        del table
+
+        with open(new_path, "r+b") as f:
+            f.write(INDEX_HEADER.pack(INDEX_MAGIC, VERSION, slots, self.used))
+        if self.table is not None:
+            self.close_index()
+        os.replace(new_path, self.index_path)
+        self.open_index()
+
+    def grow_index(self):
+        """ Rehashes into a table twice the size, REHASH_SLICE slots of the old one at a
+            time. Only fingerprints move, no puzzle is canonicalized again
+        """
+        old = self.table
+
+        def used_slots():
+            for start in range(0, self.slots, REHASH_SLICE):
+                chunk = old[start:start + REHASH_SLICE]
+                yield chunk[chunk[:, 0] != 0]
+
+        self.write_index(self.slots * 2, used_slots())
+
+    def rebuild_index(self):
+        """ Indexes every record afresh, canonicalizing each stored puzzle again """
+        slots = INITIAL_SLOTS
+        while self.count > slots * MAX_LOAD:
+            slots *= 2
+        self.used = self.count
+
+        def fingerprints():
+            for start in range(0, self.count, REHASH_SLICE):
+                numbers = range(start, min(self.count, start + REHASH_SLICE))
+                yield np.array([(fingerprint(self[n]), n + 1) for n in numbers], dtype=np.uint64).reshape(-1, 2)
+
+        self.write_index(slots, fingerprints())
+
+    def flush(self):
+        self.data.flush()
+        self.index_header.flush()
+        self.table.flush()
+
+    def close(self):
+        if self.data is not None:
+            self.flush()
+            self.data.close()
+            self.data_file.close()
+            self.data = None
+            self.close_index()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,144 @@
+from itertools import permutations, product
+from random import Random
+
+import numpy as np
+
+from .grid import SIZE, BOX, EMPTY, DIGITS, check_grid
+
+# every reordering of the rows (or columns) that keeps sudoku valid: bands are
+# shuffled, then the rows within each band
+LINE_PERMS = np.array([[BOX * order[k] + inner[k][j] for k in range(BOX) for j in range(BOX)]
+                       for order in permutations(range(BOX))
+                       for inner in product(list(permutations(range(BOX))), repeat=BOX)], dtype=np.int8)
+BAND_OF_LINE = np.arange(SIZE) // BOX
+
+
+class Transform:
+    """ A symmetry of the sudoku board: an optional transposition, then a reordering
+        of the rows and of the columns, then a relabelling of the digits.
+        apply(grid)[r][c] is relabel[source[rows[r]][cols[c]]], source being grid or its transpose
+    """
+
+    def __init__(self, transpose: bool, rows, cols, relabel):
+        """ :param rows, cols band preserving permutations of range(9), like the rows of LINE_PERMS
+            :param relabel 10 ints, relabel[d] being the digit d becomes, with relabel[EMPTY] == EMPTY
+        """
+        self.transpose = bool(transpose)
+        self.rows = tuple(int(r) for r in rows)
+        self.cols = tuple(int(c) for c in cols)
+        self.relabel = tuple(int(d) for d in relabel)
+
+    def apply(self, grid) -> list:
+        grid = check_grid(grid)
+        relabel, rows, cols = self.relabel, self.rows, self.cols
+        if self.transpose:
+            return [relabel[grid[cols[c] * SIZE + rows[r]]] for r in range(SIZE) for c in range(SIZE)]
+
+        return [relabel[grid[rows[r] * SIZE + cols[c]]] for r in range(SIZE) for c in range(SIZE)]
+
+    def inverse(self) -> "Transform":
+        """ The transform that undoes this one """
+        rows = [0] * SIZE
+        cols = [0] * SIZE
+        relabel = [EMPTY] * (SIZE + 1)
+        for i in range(SIZE):
+            rows[self.rows[i]] = i
+            cols[self.cols[i]] = i
+        for d in DIGITS:
+            relabel[self.relabel[d]] = d
+
+        if self.transpose:
+            return Transform(True, cols, rows, relabel)
+        return Transform(False, rows, cols, relabel)
+
+    def __eq__(self, other):
+        return isinstance(other, Transform) and (self.transpose, self.rows, self.cols, self.relabel) == \
+            (other.transpose, other.rows, other.cols, other.relabel)
+
+    def __repr__(self):
+        return "Transform(%r, %r, %r, %r)" % (self.transpose, self.rows, self.cols, self.relabel)
+
+
+IDENTITY = Transform(False, range(SIZE), range(SIZE), range(SIZE + 1))
+
+
+def random_transform(rng: Random = None) -> Transform:
+    """ A uniformly chosen symmetry of the board """
+    rng = rng if rng is not None else Random()
+    digits = list(DIGITS)
+    rng.shuffle(digits)
+
+    return Transform(rng.random() < 0.5,
+                     LINE_PERMS[rng.randrange(len(LINE_PERMS))],
+                     LINE_PERMS[rng.randrange(len(LINE_PERMS))],
+                     [EMPTY] + digits)
+
+
+def canonical_form(grid) -> tuple:
+    """ The representative of grid's class under the symmetry group: the smallest board,
+        read row by row, among all transformations of grid. Digits are relabelled in order
+        of first appearance, and filled cells sort before empty ones so the search settles
+        on the givens early.
+        :returns (canonical grid, Transform taking grid to it)
+    """
+    grid = check_grid(grid)
+    if all(v == EMPTY for v in grid):
+        return list(grid), IDENTITY
+
+    board = np.array(grid, dtype=np.int8).reshape(SIZE, SIZE)
+    # candidate boards: the grid or its transpose, with each column permutation applied
+    boards = np.concatenate([source[:, LINE_PERMS].transpose(1, 0, 2) for source in (board, board.T)])
+
+    # one search state per surviving (board, row choices, relabelling) so far. Every
+    # state has produced the same rows, the smallest possible, up to this point
+    board_ids = np.arange(len(boards))
+    chosen = np.zeros((len(boards), 0), dtype=np.int8)
+    used = np.zeros((len(boards), SIZE), dtype=bool)
+    labels = np.full((len(boards), SIZE + 1), -1, dtype=np.int8)
+    next_label = np.zeros(len(boards), dtype=np.int8)
+    place = 10 ** np.arange(SIZE - 1, -1, -1, dtype=np.int64)
+    rows_out = []
+
+    for k in range(SIZE):
+        valid = ~used
+        if k % BOX:
+            band = BAND_OF_LINE[chosen[:, -1]]
+            valid &= BAND_OF_LINE[None, :] == band[:, None]
+        state, row = np.nonzero(valid)
+
+        values = boards[board_ids[state], row]
+        new_labels = labels[state]
+        new_next = next_label[state].copy()
+        relabelled = np.empty_like(values)
+        pairs = np.arange(len(state))
+        for c in range(SIZE):
+            v = values[:, c]
+            fresh = (v != EMPTY) & (new_labels[pairs, v] < 0)
+            new_labels[pairs[fresh], v[fresh]] = new_next[fresh]
+            new_next += fresh
+            relabelled[:, c] = np.where(v == EMPTY, SIZE, new_labels[pairs, v])
+
+        keys = relabelled.astype(np.int64) @ place
+        keep = keys == keys.min()
+
+        state, row = state[keep], row[keep]
+        rows_out.append(relabelled[np.argmax(keep)])
+        board_ids = board_ids[state]
+        chosen = np.concatenate([chosen[state], row[:, None].astype(np.int8)], axis=1)
+        used = used[state]
+        used[np.arange(len(state)), row] = True
+        labels = new_labels[keep]
+        next_label = new_next[keep]
+
+    canonical = [EMPTY if v == SIZE else int(v) + 1 for v in np.concatenate(rows_out)]
+
+    # digits missing from grid take the labels left over, in order
+    relabel = [EMPTY] * (SIZE + 1)
+    spare = iter(sorted(set(range(SIZE)) - set(int(v) for v in labels[0] if v >= 0)))
+    for d in DIGITS:
+        label = int(labels[0][d])
+        relabel[d] = (label if label >= 0 else next(spare)) + 1
+
+    count = len(LINE_PERMS)
+    transform = Transform(board_ids[0] >= count, chosen[0], LINE_PERMS[board_ids[0] % count], relabel)
+    return canonical, transform
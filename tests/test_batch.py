@@ -0,0 +1,20 @@
+import numpy as np
+
+from sudoku import EMPTY, parse, solve
+from sudoku.batch import BLOCK_ROWS, solve_batch
+
+PUZZLE = parse("6.92..74845.63..9..1......539...5..71753.9.....6..4...9..47.5.6.67593....4......9")
+HARD = parse("4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......")
+
+
+def test_solves_across_blocks():
+    clash = [EMPTY] * 81
+    clash[0] = clash[1] = 1
+    # the last three rows fall in a second block
+    puzzles = np.array([PUZZLE, clash] * (BLOCK_ROWS // 2) + [HARD, PUZZLE, clash], dtype=np.int8)
+    solutions = solve_batch(puzzles)
+
+    assert solutions.shape == puzzles.shape
+    for row in (0, 1, len(puzzles) - 3, len(puzzles) - 2, len(puzzles) - 1):
+        expected = solve(puzzles[row].tolist())
+        assert solutions[row].tolist() == (expected if expected is not None else [EMPTY] * 81)
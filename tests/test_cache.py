@@ -0,0 +1,46 @@
+from random import Random
+
+from sudoku import EMPTY, parse, solve
+from sudoku.cache import SolutionCache
+from sudoku.symmetry import random_transform
+
+PUZZLE = parse("6.92..74845.63..9..1......539...5..71753.9.....6..4...9..47.5.6.67593....4......9")
+
+
+def test_miss_then_exact_hit():
+    cache = SolutionCache()
+    assert cache.solve(PUZZLE) == solve(PUZZLE)
+    assert (cache.stats.misses, cache.stats.hits) == (1, 0)
+
+    assert cache.solve(PUZZLE) == solve(PUZZLE)
+    assert (cache.stats.misses, cache.stats.hits, cache.stats.exact_hits) == (1, 1, 1)
+
+
+def test_symmetric_variant_hits():
+    cache = SolutionCache()
+    cache.solve(PUZZLE)
+    variant = random_transform(Random(1)).apply(PUZZLE)
+    assert variant != PUZZLE
+
+    assert cache.solve(variant) == solve(variant)
+    assert (cache.stats.misses, cache.stats.hits, cache.stats.exact_hits) == (1, 1, 0)
+
+
+def test_no_solution_is_cached():
+    cache = SolutionCache()
+    grid = [EMPTY] * 81
+    grid[0] = grid[1] = 1
+    assert cache.solve(grid) is None
+    assert cache.solve(grid) is None
+    assert (cache.stats.misses, cache.stats.hits) == (1, 1)
+
+
+def test_eviction_and_spill(tmp_path):
+    other = solve([EMPTY] * 81)
+    other[:50] = [EMPTY] * 50
+    with SolutionCache(1, spill=str(tmp_path / "spill")) as cache:
+        cache.solve(PUZZLE)
+        cache.solve(other)
+        assert cache.stats.evictions >= 1
+        assert cache.solve(PUZZLE) == solve(PUZZLE)
+        assert cache.stats.spill_hits == 1
@@ -0,0 +1,36 @@
+from sudoku import parse, solve
+from sudoku.__main__ import main
+
+PUZZLE = "6.92..74845.63..9..1......539...5..71753.9.....6..4...9..47.5.6.67593....4......9"
+SMALL = "1..............."
+CLASH = "11" + "." * 79
+
+
+def run(capsys, tmp_path, lines, *args):
+    path = tmp_path / "puzzles.txt"
+    path.write_text("\n".join(lines) + "\n")
+    status = main(list(args) + [str(path)])
+    out, err = capsys.readouterr()
+    return status, out.split(), err
+
+
+def test_solve_reports_bad_lines_and_goes_on(capsys, tmp_path):
+    status, out, err = run(capsys, tmp_path, ["# comment", PUZZLE, "12x", CLASH, SMALL], "solve")
+    assert status == 1
+    assert out == ["".join(map(str, solve(parse(PUZZLE)))), "".join(map(str, solve(parse(SMALL))))]
+    assert "line 3:" in err
+    assert "line 4: no solution" in err
+
+
+def test_solve_with_cache_takes_other_sizes(capsys, tmp_path):
+    status, out, err = run(capsys, tmp_path, [SMALL, PUZZLE, PUZZLE], "solve", "--cache", "8")
+    assert status == 0
+    assert len(out) == 3
+    assert out[1] == out[2]
+    assert '"hits": 1' in err
+
+
+def test_validate(capsys, tmp_path):
+    status, out, err = run(capsys, tmp_path, [PUZZLE, "." * 81, CLASH], "validate")
+    assert status == 1
+    assert out[1::2] == ["unique", "multiple", "invalid"]
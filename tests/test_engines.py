@@ -0,0 +1,43 @@
+import pytest
+
+from sudoku import EMPTY, SOLVERS, make_solver, parse, is_solved
+
+PUZZLE = parse("6.92..74845.63..9..1......539...5..71753.9.....6..4...9..47.5.6.67593....4......9")
+
+
+def inconsistent_grids():
+    """ Grids whose givens clash, in a row, a column and a box, and spread far apart """
+    row = list(PUZZLE)
+    row[1] = 6
+    column = [EMPTY] * 81
+    column[0] = column[72] = 5
+    box = [EMPTY] * 81
+    box[0] = box[10] = 3
+    spread = [1, 1] + [EMPTY] * 79
+    return [row, column, box, spread]
+
+
+@pytest.mark.parametrize("solver", sorted(SOLVERS))
+def test_solves_puzzle(solver):
+    engine = make_solver(PUZZLE, solver=solver)
+    assert engine.solve()
+    assert is_solved(engine.grid)
+    assert all(v == EMPTY or v == s for v, s in zip(PUZZLE, engine.grid))
+
+
+@pytest.mark.parametrize("solver", sorted(SOLVERS))
+def test_counts_agree(solver):
+    assert make_solver(PUZZLE, solver=solver).count_solutions(2) == 1
+    # ten givens fewer leaves room for more than one solution
+    loose = list(PUZZLE)
+    for i in [i for i, v in enumerate(loose) if v != EMPTY][:10]:
+        loose[i] = EMPTY
+    assert make_solver(loose, solver=solver).count_solutions(2) == 2
+
+
+@pytest.mark.parametrize("options", [dict(solver=name) for name in sorted(SOLVERS)] +
+                         [dict(solver="backtrack", candidates="sets"), dict(solver="backtrack", heuristic="first")])
+def test_inconsistent_grid_has_no_solution(options):
+    for grid in inconsistent_grids():
+        assert not make_solver(grid, **options).solve()
+        assert make_solver(grid, **options).count_solutions(2) == 0
@@ -0,0 +1,36 @@
+from random import Random
+
+import pytest
+
+from sudoku import EMPTY, SYMMETRIES, generate, count_solutions, is_consistent, solve
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_generated_puzzle_has_one_solution(seed):
+    puzzle = generate(30, rng=Random(seed))
+    assert is_consistent(puzzle)
+    assert count_solutions(puzzle, 2) == 1
+    assert sum(v != EMPTY for v in puzzle) >= 30
+
+
+@pytest.mark.parametrize("symmetry", SYMMETRIES)
+def test_symmetric_puzzle_has_one_solution(symmetry):
+    puzzle = generate(30, rng=Random(0), symmetry=symmetry)
+    assert count_solutions(puzzle, 2) == 1
+
+
+def test_same_seed_same_puzzle():
+    assert generate(30, rng=Random(7)) == generate(30, rng=Random(7))
+
+
+def test_given_solution_is_kept():
+    solution = solve([EMPTY] * 81)
+    puzzle = generate(30, rng=Random(0), solution=solution)
+    assert all(v == EMPTY or v == s for v, s in zip(puzzle, solution))
+    assert solve(puzzle) == solution
+
+
+def test_other_board_size():
+    puzzle = generate(8, rng=Random(0), box=2)
+    assert len(puzzle) == 16
+    assert count_solutions(puzzle, 2) == 1
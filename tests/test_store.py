@@ -0,0 +1,28 @@
+import os
+from random import Random
+
+from sudoku import generate
+from sudoku.store import PuzzleStore
+from sudoku.symmetry import random_transform
+
+PUZZLES = [generate(30, rng=Random(seed)) for seed in range(3)]
+
+
+def test_add_find_and_deduplicate(tmp_path):
+    with PuzzleStore(str(tmp_path / "store")) as store:
+        assert [store.add(p) for p in PUZZLES] == [(0, True), (1, True), (2, True)]
+        assert store.add(random_transform(Random(5)).apply(PUZZLES[1])) == (1, False)
+        assert len(store) == 3
+        assert list(store) == PUZZLES
+
+
+def test_missing_index_is_rebuilt(tmp_path):
+    path = str(tmp_path / "store")
+    with PuzzleStore(path) as store:
+        for p in PUZZLES:
+            store.add(p)
+    os.remove(path + ".idx")
+
+    with PuzzleStore(path) as store:
+        assert [store.find(p) for p in PUZZLES] == [0, 1, 2]
+        assert store.add(PUZZLES[2]) == (2, False)